@@ -20,12 +20,30 @@
 import argparse
 import logging
 import platform
+import posixpath
+import re
 import sys
 
-from openvino_workbench.constants import EXAMPLE_COMMAND, ABORTING_EXIT_MESSAGE, CLI_COMMAND, LOGGER_NAME
+from openvino_workbench.constants import (EXAMPLE_COMMAND, ABORTING_EXIT_MESSAGE, CLI_COMMAND, LOGGER_NAME,
+                                          CONTAINER_LOG_FILE_MAX_SIZE_MB, REGISTRY_METADATA_CACHE_TTL,
+                                          PULL_STALL_TIMEOUT, AUTO_PORT, DEFAULT_PUBLIC_PORT, FLEET_MAX_WORKERS,
+                                          AUTO_NUMA_NODE, DL_WB_DOCKER_CONFIG_PATH, DEFAULT_TMPFS_MODE,
+                                          SCRATCH_TMPFS_PROFILE, INTERNAL_PORT, HOST_NETWORK_MODE,
+                                          BRIDGE_NETWORK_MODE, ASSETS_DIRECTORY_BENCHMARK_WARN,
+                                          ASSETS_DIRECTORY_BENCHMARK_REFUSE, FS_BENCHMARK_TIME_BUDGET)
+from openvino_workbench.bundle import BUNDLE_CODECS
 from openvino_workbench.utils import get_proxy_from_env
 
 
+def parse_port(value: str):
+    if value == AUTO_PORT:
+        return value
+    try:
+        return int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f'invalid port: "{value}", specify a number or "{AUTO_PORT}"') from error
+
+
 class StarterArgumentsParser:
     def __init__(self):
         self._logger = logging.getLogger(LOGGER_NAME)
@@ -50,6 +68,64 @@ class StarterArgumentsParser:
                                        'newer version of the DL Workbench image.',
                                   default=False)
 
+        self._parser.add_argument('--show-layer-progress',
+                                  action='store_true',
+                                  required=False,
+                                  help='Displays the pulling progress of every image layer.',
+                                  default=False)
+
+        self._parser.add_argument('--pull-report',
+                                  required=False,
+                                  help='Saves the timeline of the image layers pulling and the throughput statistics '
+                                       'to the provided JSON file. Format: /path/to/report.json')
+
+        self._parser.add_argument('--metadata-cache-ttl',
+                                  required=False,
+                                  type=int,
+                                  help='Specifies for how many seconds the image metadata requested from the registry '
+                                       'is cached on the machine. Set to 0 to disable the cache.',
+                                  default=REGISTRY_METADATA_CACHE_TTL)
+
+        self._parser.add_argument('--refresh-metadata',
+                                  action='store_true',
+                                  required=False,
+                                  help='Ignores the cached image metadata and requests it from the registry again.',
+                                  default=False)
+
+        self._parser.add_argument('--registry-mirror',
+                                  action='append',
+                                  required=False,
+                                  dest='registry_mirrors',
+                                  help='Specifies a registry mirror to pull the image from, e.g. a local pull-through '
+                                       'cache. Can be specified several times, the fastest mirror that has the image '
+                                       'is used. Format: [http://]host[:port][/prefix]',
+                                  default=[])
+
+        self._parser.add_argument('--pull-stall-timeout',
+                                  required=False,
+                                  type=int,
+                                  help='Specifies after how many seconds without progress the pull is switched '
+                                       'to the next registry mirror or to the original registry.',
+                                  default=PULL_STALL_TIMEOUT)
+
+        # Offline bundles
+        bundle_mode = self._parser.add_mutually_exclusive_group()
+        bundle_mode.add_argument('--export-bundle',
+                                 required=False,
+                                 help='Exports the image specified with the "--image" argument to a single-file '
+                                      'bundle for the machines without the Internet access and exits. '
+                                      'The image is pulled if it is not present. Format: /path/to/bundle')
+        bundle_mode.add_argument('--import-bundle',
+                                 required=False,
+                                 help='Imports the image from a bundle created with "--export-bundle" and starts '
+                                      'the DL Workbench with it. Format: /path/to/bundle')
+        self._parser.add_argument('--bundle-compression',
+                                  required=False,
+                                  choices=tuple(BUNDLE_CODECS),
+                                  help='Specifies the compression of the exported bundle. '
+                                       'The "zstd" compression requires the "zstandard" package.',
+                                  default='gzip')
+
         self._parser.add_argument('--ip',
                                   required=False,
                                   help='Specifies the outside IP on which DL Workbench will be available.',
@@ -57,10 +133,11 @@ class StarterArgumentsParser:
 
         self._parser.add_argument('--port',
                                   required=False,
-                                  type=int,
+                                  type=parse_port,
                                   help='Maps the Docker container port to the provided host port '
-                                       'to get access to the DL Workbench from a web browser.',
-                                  default=5665)
+                                       'to get access to the DL Workbench from a web browser. '
+                                       f'Specify "{AUTO_PORT}" to use any free port.',
+                                  default=DEFAULT_PUBLIC_PORT)
 
         self._parser.add_argument('--container-name',
                                   required=False,
@@ -80,6 +157,18 @@ class StarterArgumentsParser:
                                        'Provide the container name to restart. '
                                        'DL Workbench is restarted with the same parameters as on the first run.')
 
+        self._parser.add_argument('--container-log-file',
+                                  required=False,
+                                  help='Saves a copy of the container logs displayed in the terminal to the provided '
+                                       'file. Format: /path/to/file.log')
+
+        self._parser.add_argument('--container-log-file-max-size',
+                                  required=False,
+                                  type=int,
+                                  help='Specifies the maximum size of the container log file in megabytes. '
+                                       'When the size is reached, the file is rotated.',
+                                  default=CONTAINER_LOG_FILE_MAX_SIZE_MB)
+
         # Devices
         self._parser.add_argument('--enable-gpu',
                                   action='store_true',
@@ -102,12 +191,29 @@ class StarterArgumentsParser:
                                    'NOTE: MYRIAD and HDDL arguments cannot be set simultaneously.',
                               default=False)
 
+        # CPU and memory
+        self._add_cpu_arguments()
+        self._add_memory_arguments()
+
         # Assets
         self._parser.add_argument('--assets-directory',
                                   required=False,
                                   help='Mounts a provided local directory to the "/home/workbench/.workbench" '
                                        'directory in the Docker container. '
                                        'The directory is not mounted by default. Format: /path/to/directory')
+        self._parser.add_argument('--assets-directory-benchmark',
+                                  required=False,
+                                  choices=(ASSETS_DIRECTORY_BENCHMARK_WARN, ASSETS_DIRECTORY_BENCHMARK_REFUSE),
+                                  help='Measures the throughput and the latency of the file system of the assets '
+                                       f'directory in about {FS_BENCHMARK_TIME_BUDGET} seconds before the start. '
+                                       'Warns or refuses to start if the file system is too slow for DL Workbench, '
+                                       'for example, a network share.')
+        self._parser.add_argument('--persistent-volume',
+                                  required=False,
+                                  help='Stores the DL Workbench data in the named Docker volume mounted to the '
+                                       f'"{DL_WB_DOCKER_CONFIG_PATH}" directory. The volume is created if it does '
+                                       'not exist and is reused by the next containers, so they start without '
+                                       'the initialization. Format: workbench_data')
 
         # Proxies
         self._parser.add_argument('--http-proxy',
@@ -186,6 +292,18 @@ class StarterArgumentsParser:
                                   required=False,
                                   help='Specifies the alias of the DL Workbench container in the network.',
                                   default='workbench')
+        self._parser.add_argument('--network-mode',
+                                  required=False,
+                                  choices=(BRIDGE_NETWORK_MODE, HOST_NETWORK_MODE),
+                                  help='Specifies the network mode of the DL Workbench container. In the '
+                                       f'"{HOST_NETWORK_MODE}" mode the container uses the network of the machine '
+                                       f'and is available on the port {INTERNAL_PORT} without the Docker proxy. '
+                                       'Supported on Linux only.',
+                                  default=BRIDGE_NETWORK_MODE)
+
+        # Fleet, standby pool and pre-initialized images
+        self._add_fleet_and_pool_arguments()
+        self._add_bake_arguments()
 
         # Misc
         self._parser.add_argument('--base-prefix',
@@ -193,9 +311,137 @@ class StarterArgumentsParser:
                                   help='Specifies the base prefix of the DL Workbench web application.',
                                   default='/')
 
+    def _add_cpu_arguments(self):
+        self._parser.add_argument('--cpuset-cpus',
+                                  required=False,
+                                  help='Pins the DL Workbench container to the provided CPUs. Format: 0-3,8-11')
+        self._parser.add_argument('--cpuset-mems',
+                                  required=False,
+                                  help='Allocates the memory of the DL Workbench container on the provided NUMA '
+                                       'nodes. Format: 0,1')
+        self._parser.add_argument('--numa-node',
+                                  required=False,
+                                  help='Pins the DL Workbench container to all the CPUs and the memory of the '
+                                       f'provided NUMA node. Specify "{AUTO_NUMA_NODE}" to use the node with the '
+                                       'most free memory. The instances of the fleet get separate CPUs.')
+        self._parser.add_argument('--cpu-shares',
+                                  required=False,
+                                  type=int,
+                                  help='Specifies the relative CPU weight of the DL Workbench container.')
+        self._parser.add_argument('--cpus',
+                                  required=False,
+                                  type=float,
+                                  help='Limits the number of CPUs the DL Workbench container can use, e.g. 2.5.')
+
+    def _add_memory_arguments(self):
+        self._parser.add_argument('--shm-size',
+                                  required=False,
+                                  help='Specifies the size of the shared memory "/dev/shm" in the DL Workbench '
+                                       'container. Docker provides 64 MB by default. Format: 2g')
+        self._parser.add_argument('--memory',
+                                  required=False,
+                                  help='Limits the memory of the DL Workbench container. Format: 16g')
+        self._parser.add_argument('--memory-reservation',
+                                  required=False,
+                                  help='Specifies the memory that is reserved for the DL Workbench container when '
+                                       'the machine is low on memory. Format: 8g')
+        self._parser.add_argument('--memory-swap',
+                                  required=False,
+                                  help='Limits the memory plus swap of the DL Workbench container, requires '
+                                       '"--memory". Specify -1 for the unlimited swap. Format: 32g')
+        self._parser.add_argument('--ulimit-memlock',
+                                  required=False,
+                                  help='Specifies the maximum locked-in-memory size in the DL Workbench container. '
+                                       'Format: 64m or unlimited')
+        self._parser.add_argument('--ulimit-nofile',
+                                  required=False,
+                                  type=int,
+                                  help='Specifies the maximum number of open files in the DL Workbench container.')
+        self._parser.add_argument('--hugepages',
+                                  action='store_true',
+                                  required=False,
+                                  help='Mounts the host hugepages file system "/dev/hugepages" to the DL Workbench '
+                                       'container. The hugepages should be reserved on the machine.',
+                                  default=False)
+        self._parser.add_argument('--tmpfs',
+                                  action='append',
+                                  dest='tmpfs_mounts',
+                                  required=False,
+                                  help='Mounts a temporary file system in memory to the provided directory of the '
+                                       'DL Workbench container. Can be specified several times. The size defaults '
+                                       'to a quarter of the available memory, the mode defaults to '
+                                       f'{DEFAULT_TMPFS_MODE}. Format: /path[:size[:mode]], e.g. /tmp:4g:1777')
+        self._parser.add_argument('--scratch-tmpfs',
+                                  action='store_true',
+                                  required=False,
+                                  help='Mounts temporary file systems in memory to the scratch directories of the '
+                                       'model conversion and calibration: '
+                                       f'{", ".join(SCRATCH_TMPFS_PROFILE)}.',
+                                  default=False)
+
+    def _add_fleet_and_pool_arguments(self):
+        fleet = self._parser.add_mutually_exclusive_group()
+        fleet.add_argument('--fleet',
+                           required=False,
+                           type=int,
+                           help='Starts the provided number of DL Workbench instances in the detached mode. '
+                                'The instances are named after the "--container-name" argument with a suffix '
+                                'and get free host ports.')
+        fleet.add_argument('--fleet-manifest',
+                           required=False,
+                           help='Starts the DL Workbench instances listed in the JSON file in the detached mode. '
+                                'Format: [{"name": "workbench_alice", "port": 5701}, {"name": "workbench_bob"}], '
+                                'instances without a port get a free host port.')
+        self._parser.add_argument('--fleet-workers',
+                                  required=False,
+                                  type=int,
+                                  help='Specifies how many instances of the fleet are started concurrently.',
+                                  default=FLEET_MAX_WORKERS)
+
+        # Standby pool
+        self._parser.add_argument('--pool-size',
+                                  required=False,
+                                  type=int,
+                                  help='Keeps the provided number of pre-initialized stopped containers that are '
+                                       'started in seconds with "--claim". Without "--claim" fills the pool and keeps '
+                                       'it filled until stopped, or exits once filled in the detached mode.',
+                                  default=0)
+        self._parser.add_argument('--claim',
+                                  action='store_true',
+                                  required=False,
+                                  help='Starts a pre-initialized container from the pool created with "--pool-size" '
+                                       'and the same arguments. Starts a new container if the pool is empty.',
+                                  default=False)
+
+    def _add_bake_arguments(self):
+        self._parser.add_argument('--bake',
+                                  action='store_true',
+                                  required=False,
+                                  help='Starts a container with the provided arguments, waits for it to initialize '
+                                       'and commits it to a local image, then exits. Later launches with the same '
+                                       'image and arguments start from the committed image without the first-run '
+                                       'setup.',
+                                  default=False)
+        self._parser.add_argument('--no-baked-image',
+                                  action='store_true',
+                                  required=False,
+                                  help='Starts the container from the specified image even if there is an image '
+                                       'baked with "--bake" for the same arguments.',
+                                  default=False)
+
     def _validate_arguments(self):
         self._validate_restart_arguments()
         self._validate_ssl_arguments()
+        self._validate_fleet_arguments()
+        self._validate_standby_pool_arguments()
+        self._validate_bake_arguments()
+        self._validate_cpu_arguments()
+        self._validate_tmpfs_arguments()
+        self._validate_network_arguments()
+        self._validate_persistent_volume_arguments()
+        if self.arguments.assets_directory_benchmark and not self.arguments.assets_directory:
+            self._parser.error('ERROR: "--assets-directory-benchmark" requires "--assets-directory".'
+                               f'{ABORTING_EXIT_MESSAGE}')
         if platform.system() == 'Windows':
             self._validate_arguments_for_windows()
 
@@ -219,6 +465,141 @@ class StarterArgumentsParser:
                                '--ssl-certificate-name certificate.pem'
                                f'{ABORTING_EXIT_MESSAGE}')
 
+    def _validate_fleet_arguments(self):
+        if not self.arguments.fleet and not self.arguments.fleet_manifest:
+            return
+        self._logger.debug('Validating arguments for the fleet.')
+        if self.arguments.fleet is not None and self.arguments.fleet < 1:
+            self._parser.error('ERROR: The number of the fleet instances should be positive.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        if self.arguments.fleet_workers < 1:
+            self._parser.error('ERROR: The number of the fleet workers should be positive.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # All the instances would share the same database and configuration files
+        if self.arguments.assets_directory:
+            self._parser.error('ERROR: "--assets-directory" cannot be used with the fleet as the instances cannot '
+                               'share the assets directory.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+
+    def _validate_standby_pool_arguments(self):
+        if not self.arguments.pool_size and not self.arguments.claim:
+            return
+        self._logger.debug('Validating arguments for the standby pool.')
+        if self.arguments.pool_size < 0:
+            self._parser.error('ERROR: The size of the standby pool should not be negative.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        if self.arguments.fleet or self.arguments.fleet_manifest:
+            self._parser.error('ERROR: The standby pool cannot be used with the fleet.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # All the standbys would share the same database and configuration files
+        if self.arguments.assets_directory:
+            self._parser.error('ERROR: "--assets-directory" cannot be used with the standby pool as the standbys '
+                               'cannot share the assets directory.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+
+    def _validate_bake_arguments(self):
+        if not self.arguments.bake:
+            return
+        self._logger.debug('Validating arguments for baking.')
+        if (self.arguments.fleet or self.arguments.fleet_manifest or self.arguments.pool_size
+                or self.arguments.claim):
+            self._parser.error('ERROR: "--bake" cannot be used with the fleet or the standby pool.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # The database is stored in the mounted directory that is not committed to the image
+        if self.arguments.assets_directory:
+            self._parser.error('ERROR: "--bake" cannot be used with "--assets-directory" as the mounted directory '
+                               'is not a part of the image.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # The login token is generated on the first start, all the containers of the image would share it
+        if self.arguments.enable_authentication:
+            self._parser.error('ERROR: "--bake" cannot be used with "--enable-authentication" as the login token '
+                               'would be committed to the image and shared by all the containers started from it.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+
+    def _validate_tmpfs_arguments(self):
+        if not self.arguments.tmpfs_mounts:
+            return
+        self._logger.debug('Validating arguments for the tmpfs mounts.')
+        for tmpfs_mount in self.arguments.tmpfs_mounts:
+            path, _, size_and_mode = tmpfs_mount.partition(':')
+            _, _, mode = size_and_mode.partition(':')
+            if not path.startswith('/'):
+                self._parser.error(f'ERROR: The tmpfs path should be absolute: "{tmpfs_mount}".'
+                                   f'{ABORTING_EXIT_MESSAGE}')
+            if mode and not re.fullmatch(r'[0-7]{3,4}', mode):
+                self._parser.error(f'ERROR: The tmpfs mode should be octal, e.g. 1777: "{tmpfs_mount}".'
+                                   f'{ABORTING_EXIT_MESSAGE}')
+            # The database and the assets would be lost when the container stops
+            container_path = posixpath.normpath(path)
+            if posixpath.commonpath((container_path, DL_WB_DOCKER_CONFIG_PATH)) == container_path:
+                self._parser.error(f'ERROR: The tmpfs cannot be mounted to "{path}", the DL Workbench data would '
+                                   f'not persist.{ABORTING_EXIT_MESSAGE}')
+
+    def _validate_network_arguments(self):
+        if self.arguments.network_mode != HOST_NETWORK_MODE:
+            return
+        self._logger.debug('Validating arguments for the host network mode.')
+        # Docker Desktop runs the containers in a virtual machine, so the host network is the network of the machine
+        if platform.system() != 'Linux':
+            self._parser.error(f'ERROR: "--network-mode {HOST_NETWORK_MODE}" is supported on Linux only.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # Several containers cannot listen on the same port of the machine
+        if (self.arguments.fleet or self.arguments.fleet_manifest or self.arguments.pool_size
+                or self.arguments.claim or self.arguments.bake):
+            self._parser.error(f'ERROR: "--network-mode {HOST_NETWORK_MODE}" cannot be used with the fleet, '
+                               'the standby pool or "--bake".'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        if self.arguments.cloud_service_address:
+            self._parser.error(f'ERROR: "--network-mode {HOST_NETWORK_MODE}" cannot be used with '
+                               '"--cloud-service-address".'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        if self.arguments.port == AUTO_PORT:
+            self.arguments.port = DEFAULT_PUBLIC_PORT
+        if self.arguments.port != DEFAULT_PUBLIC_PORT:
+            self._parser.error(f'ERROR: In the "{HOST_NETWORK_MODE}" network mode DL Workbench is available on the '
+                               f'port {INTERNAL_PORT} only.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+
+    def _validate_persistent_volume_arguments(self):
+        if not self.arguments.persistent_volume:
+            return
+        self._logger.debug('Validating arguments for the persistent volume.')
+        if self.arguments.assets_directory:
+            self._parser.error('ERROR: "--persistent-volume" cannot be used with "--assets-directory" as both of '
+                               f'them are mounted to "{DL_WB_DOCKER_CONFIG_PATH}".'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # All the containers would share the same database and configuration files
+        if (self.arguments.fleet or self.arguments.fleet_manifest or self.arguments.pool_size
+                or self.arguments.claim):
+            self._parser.error('ERROR: "--persistent-volume" cannot be used with the fleet or the standby pool as '
+                               'the containers cannot share the volume.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # The volume is not committed to the image
+        if self.arguments.bake:
+            self._parser.error('ERROR: "--bake" cannot be used with "--persistent-volume" as the volume is not a part '
+                               'of the image.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # Docker treats the names with slashes as the paths of the local directories
+        if not re.fullmatch(r'[a-zA-Z0-9][a-zA-Z0-9_.-]*', self.arguments.persistent_volume):
+            self._parser.error('ERROR: The volume name should contain letters, digits and the "_", ".", "-" '
+                               'characters only.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+
+    def _validate_cpu_arguments(self):
+        if self.arguments.numa_node is None:
+            return
+        self._logger.debug('Validating arguments for the CPU pinning.')
+        if self.arguments.numa_node != AUTO_NUMA_NODE and not self.arguments.numa_node.isdigit():
+            self._parser.error(f'ERROR: The NUMA node should be a number or "{AUTO_NUMA_NODE}".'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        if self.arguments.cpuset_cpus or self.arguments.cpuset_mems:
+            self._parser.error('ERROR: "--numa-node" cannot be used with "--cpuset-cpus" or "--cpuset-mems".'
+                               f'{ABORTING_EXIT_MESSAGE}')
+        # Docker Desktop runs the containers in a virtual machine that does not have the host topology
+        if platform.system() != 'Linux':
+            self._parser.error('ERROR: "--numa-node" is supported on Linux only.'
+                               f'{ABORTING_EXIT_MESSAGE}')
+
     def _validate_restart_arguments(self):
         if not self.arguments.restart:
             return
@@ -0,0 +1,110 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Images with the pre-initialized DL Workbench database
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import copy
+import logging
+import sys
+from typing import Optional, Tuple
+
+from docker import DockerClient
+from docker.errors import NotFound
+from docker.utils import parse_repository_tag
+from openvino_workbench.constants import (LOGGER_NAME, ABORTING_EXIT_MESSAGE, INTERNAL_PORT, BAKED_BASE_IMAGE_LABEL,
+                                          BAKED_CONFIG_LABEL, BAKED_STARTUP_SECONDS_LABEL, BAKE_STOP_TIMEOUT)
+from openvino_workbench.container import DockerContainer
+from openvino_workbench.container_state import ContainerStateIndex
+from openvino_workbench.docker_config_creator import get_config_hash
+from openvino_workbench.port_allocator import HostPortAllocator
+
+
+class ImageBaker:
+    """
+    Commits a container that went through the first start, i.e. initialized the database, to a derived image.
+    The derived image is tagged with the base image ID and the config hash, so the launches with the same image
+    and config find it and start without the first-run setup.
+    """
+
+    def __init__(self, docker_client: DockerClient, config: dict, state_index: Optional[ContainerStateIndex] = None):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.config = config
+        self.config_hash = get_config_hash(config)
+        self.base_image_id = self._client.images.get(config['image']).id
+        repository, _ = parse_repository_tag(config['image'])
+        self.baked_image_name = f'{repository}:baked-{self.base_image_id.split(":")[-1][:12]}-{self.config_hash}'
+        self._state_index = state_index or ContainerStateIndex(docker_client)
+        self._bake_container_name: Optional[str] = None
+
+    def find_baked_image(self) -> Optional[Tuple[str, Optional[float]]]:
+        """Returns the baked image ID and the startup time of the base image, None if the image is not baked"""
+        images = self._client.api.images(filters={'label': [f'{BAKED_BASE_IMAGE_LABEL}={self.base_image_id}',
+                                                            f'{BAKED_CONFIG_LABEL}={self.config_hash}']})
+        if not images:
+            return None
+        labels = images[0].get('Labels') or {}
+        startup_seconds = labels.get(BAKED_STARTUP_SECONDS_LABEL)
+        return images[0]['Id'], float(startup_seconds) if startup_seconds else None
+
+    def bake(self, network_name: str) -> str:
+        self._logger.info(f'Baking the image {self.baked_image_name} with the initialized DL Workbench...\n')
+        config = copy.deepcopy(self.config)
+        # The temporary container should not take the port and the name of the user container
+        port = HostPortAllocator(self._client, ip_address=config['ports'][INTERNAL_PORT][0]).allocate()
+        self._bake_container_name = self._get_free_bake_container_name()
+        config['name'] = self._bake_container_name
+        config['ports'][INTERNAL_PORT] = (config['ports'][INTERNAL_PORT][0], port)
+        config['environment']['PUBLIC_PORT'] = port
+
+        container = DockerContainer(docker_client=self._client, config=config, state_index=self._state_index)
+        if not container.start_in_background(network_name=network_name,
+                                             network_alias=config['environment']['NETWORK_ALIAS']):
+            self.remove_bake_container()
+            self._logger.info(f'ERROR: The container did not become ready, the image is not baked.'
+                              f'{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+        self._logger.info(f'The container became ready in {container.startup_duration:.1f} seconds, committing it...')
+
+        # The services should flush their data before the file system is committed
+        self._client.api.stop(self._bake_container_name, timeout=BAKE_STOP_TIMEOUT)
+        repository, tag = parse_repository_tag(self.baked_image_name)
+        self._client.api.commit(self._bake_container_name, repository=repository, tag=tag,
+                                conf={'Labels': {BAKED_BASE_IMAGE_LABEL: self.base_image_id,
+                                                 BAKED_CONFIG_LABEL: self.config_hash,
+                                                 BAKED_STARTUP_SECONDS_LABEL: f'{container.startup_duration:.1f}'}})
+        self.remove_bake_container()
+        self._logger.info(f'The image {self.baked_image_name} is baked. '
+                          'Launches with the same image and arguments use it automatically.')
+        return self.baked_image_name
+
+    def remove_bake_container(self):
+        if not self._bake_container_name:
+            return
+        try:
+            self._client.api.remove_container(self._bake_container_name, force=True)
+        except NotFound:
+            self._logger.debug(f'The container {self._bake_container_name} is already removed.')
+        self._bake_container_name = None
+
+    def _get_free_bake_container_name(self) -> str:
+        name_prefix = f'{self.config["name"]}_bake'
+        taken_names = self._state_index.get_names_with_prefix(name_prefix)
+        index = 0
+        while f'{name_prefix}_{index}' in taken_names:
+            index += 1
+        return f'{name_prefix}_{index}'
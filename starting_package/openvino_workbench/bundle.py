@@ -0,0 +1,352 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Export and import of the offline DL Workbench image bundles
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import logging
+import queue
+import struct
+import sys
+import tarfile
+import threading
+import zlib
+from typing import Callable, Iterable, Iterator, Optional
+
+from docker import DockerClient
+from docker.errors import APIError, ImageLoadError
+from docker.utils import parse_repository_tag
+from openvino_workbench.constants import (LOGGER_NAME, ABORTING_EXIT_MESSAGE, BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION,
+                                          BUNDLE_CHUNK_SIZE, BUNDLE_GZIP_LEVEL)
+from openvino_workbench.image_index import LocalImageIndex
+from tqdm import tqdm
+
+# The bundle ends with the JSON manifest, its length and the magic bytes
+BUNDLE_TRAILER = struct.Struct('>Q8s')
+
+
+class _GzipCodec:
+    name = 'gzip'
+
+    @staticmethod
+    def compressor():
+        # 31 window bits stand for the gzip container
+        return zlib.compressobj(BUNDLE_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    @staticmethod
+    def decompressor():
+        return zlib.decompressobj(31)
+
+
+class _ZstdCodec:
+    name = 'zstd'
+
+    @staticmethod
+    def compressor():
+        import zstandard  # pylint: disable=import-outside-toplevel,import-error
+        return zstandard.ZstdCompressor(threads=-1, write_checksum=True).compressobj()
+
+    @staticmethod
+    def decompressor():
+        import zstandard  # pylint: disable=import-outside-toplevel,import-error
+        return zstandard.ZstdDecompressor().decompressobj()
+
+
+BUNDLE_CODECS = {codec.name: codec for codec in (_GzipCodec, _ZstdCodec)}
+
+
+class _TeeReader:
+    """File-like object over the chunks that passes every read byte to the callback"""
+
+    def __init__(self, chunks: Iterable[bytes], on_data: Callable[[bytes], None]):
+        self._chunks = iter(chunks)
+        self._on_data = on_data
+        self._chunk = b''
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        parts = []
+        while size != 0:
+            if self._position >= len(self._chunk):
+                self._chunk = next(self._chunks, b'')
+                self._position = 0
+                if not self._chunk:
+                    break
+            end = len(self._chunk) if size < 0 else min(len(self._chunk), self._position + size)
+            parts.append(self._chunk[self._position:end])
+            if size > 0:
+                size -= end - self._position
+            self._position = end
+        data = b''.join(parts)
+        if data:
+            self._on_data(data)
+        return data
+
+
+class _QueueWriter:
+    """File-like object that passes written data to the bounded queue, so the writer waits for the reader"""
+
+    def __init__(self, output_queue: queue.Queue):
+        self._queue = output_queue
+
+    def write(self, data: bytes) -> int:
+        self._queue.put(bytes(data))
+        return len(data)
+
+
+class ImageBundle:
+    """
+    Single-file offline bundle of the DL Workbench image:
+    magic bytes, compressed `docker save` stream, JSON manifest, manifest length, magic bytes.
+    Both export and import are streamed, the image tarball is never staged on disk or in memory.
+    """
+
+    BAR_FORMATTING = '{desc}: |{bar}|{percentage:3.0f}%. Elapsed Time: {elapsed}. Remaining (Estimated): {' \
+                     'remaining}. '
+
+    def __init__(self, docker_client: DockerClient, path: str, image_index: Optional[LocalImageIndex] = None):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.path = path
+        self._image_index = image_index
+
+    def export(self, image_name: str, compression: str = 'gzip'):
+        self._logger.debug(f'Exporting the image {image_name} to the bundle {self.path} with {compression}.')
+        codec = self._get_codec(compression)
+        image = self._client.images.get(image_name)
+        compressor = codec.compressor()
+        payload_hash = hashlib.sha256()
+
+        with open(self.path, 'wb') as bundle_file, \
+                tqdm(desc='Exporting Image', bar_format=self.BAR_FORMATTING, total=image.attrs.get('Size') or None,
+                     ncols=90, ascii=True) as progress_bar:
+            bundle_file.write(BUNDLE_MAGIC)
+            payload_offset = bundle_file.tell()
+
+            def write_compressed(data: bytes):
+                compressed_data = compressor.compress(data)
+                payload_hash.update(compressed_data)
+                bundle_file.write(compressed_data)
+                progress_bar.update(len(data))
+
+            # Only a tag of the image can be saved with the image, other references are restored on import
+            image_stream = _TeeReader(image.save(chunk_size=BUNDLE_CHUNK_SIZE,
+                                                 named=image_name if image_name in image.tags else True),
+                                      write_compressed)
+            layer_files = self._hash_layer_files(image_stream)
+            # The end of the archive might be left unread by tarfile
+            image_stream.read()
+
+            compressed_tail = compressor.flush()
+            payload_hash.update(compressed_tail)
+            bundle_file.write(compressed_tail)
+            payload_size = bundle_file.tell() - payload_offset
+
+            manifest = {
+                'format_version': BUNDLE_FORMAT_VERSION,
+                'image': image_name,
+                'image_id': image.id,
+                'tags': image.tags,
+                'repo_digests': image.attrs.get('RepoDigests') or [],
+                'compression': codec.name,
+                'payload_offset': payload_offset,
+                'payload_size': payload_size,
+                'payload_sha256': payload_hash.hexdigest(),
+                'layers': [{'diff_id': diff_id, **layer_files.get(diff_id, {'path': None, 'size': None})}
+                           for diff_id in image.attrs.get('RootFS', {}).get('Layers', [])],
+            }
+            encoded_manifest = json.dumps(manifest).encode('utf-8')
+            bundle_file.write(encoded_manifest)
+            bundle_file.write(BUNDLE_TRAILER.pack(len(encoded_manifest), BUNDLE_MAGIC))
+
+        self._logger.debug(f'Bundle manifest: {manifest}.')
+        self._logger.info(f'\nThe image {image_name} is exported to the bundle: {self.path}')
+
+    def read_manifest(self) -> dict:
+        with open(self.path, 'rb') as bundle_file:
+            if bundle_file.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+                raise ValueError(f'The file {self.path} is not a DL Workbench image bundle')
+            trailer_offset = bundle_file.seek(0, os.SEEK_END) - BUNDLE_TRAILER.size
+            bundle_file.seek(trailer_offset)
+            manifest_size, trailing_magic = BUNDLE_TRAILER.unpack(bundle_file.read(BUNDLE_TRAILER.size))
+            if trailing_magic != BUNDLE_MAGIC:
+                raise ValueError(f'The bundle {self.path} is incomplete')
+            bundle_file.seek(trailer_offset - manifest_size)
+            manifest = json.loads(bundle_file.read(manifest_size).decode('utf-8'))
+        if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f'Unsupported bundle format version: {manifest.get("format_version")}')
+        return manifest
+
+    def import_(self) -> str:
+        """Loads the image from the bundle and returns the reference to start the image with"""
+        self._logger.debug(f'Importing the image from the bundle {self.path}.')
+        try:
+            manifest = self.read_manifest()
+        except (OSError, ValueError) as error:
+            self._logger.debug('Could not read the bundle manifest.', exc_info=True)
+            self._logger.info(f'ERROR: Could not read the image bundle: {error}.{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+        self._logger.debug(f'Bundle manifest: {manifest}.')
+
+        image_index = self._image_index or LocalImageIndex(self._client)
+        if image_index.has(manifest['image_id']):
+            self._logger.info(f'The image {manifest["image"]} from the bundle is present on the machine. '
+                              'Continuing with it...\n')
+            return self._restore_image_reference(manifest)
+
+        if not self._is_payload_valid(manifest):
+            self._logger.info(f'ERROR: The image bundle {self.path} is corrupted, the checksum does not match.'
+                              f'{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+
+        skipped_layer_paths = self._get_present_layer_paths(manifest, image_index)
+        try:
+            self._load(manifest, skipped_layer_paths)
+        except (APIError, ImageLoadError):
+            if not skipped_layer_paths:
+                raise
+            self._logger.debug('Could not load the bundle without the present layers, loading all layers.',
+                               exc_info=True)
+            self._load(manifest, skipped_layer_paths=set())
+
+        self._logger.info(f'\nThe image {manifest["image"]} is imported from the bundle.')
+        image_reference = self._restore_image_reference(manifest)
+        image_index.refresh()
+        return image_reference
+
+    def _restore_image_reference(self, manifest: dict) -> str:
+        """
+        Tags the loaded image with the exported reference, the image ID is returned for the digest references
+        as Docker restores the digests only on pull
+        """
+        repository, tag = parse_repository_tag(manifest['image'])
+        if '@' in manifest['image'] or not tag:
+            self._logger.debug(f'The digest reference {manifest["image"]} cannot be restored, '
+                               f'using the image ID {manifest["image_id"]}.')
+            return manifest['image_id']
+        self._client.api.tag(manifest['image_id'], repository, tag)
+        return manifest['image']
+
+    def _hash_layer_files(self, image_stream: _TeeReader) -> dict:
+        """
+        Returns the paths and sizes of the layer files keyed by their diff IDs. The layer files are hashed
+        on the way, their hashes are the layer diff IDs used to skip the layers present on the machine on import.
+        """
+        layer_files = {}
+        with tarfile.open(fileobj=image_stream, mode='r|') as image_tar:
+            for member in image_tar:
+                if not member.isfile() or not self._is_layer_file(member.name):
+                    continue
+                layer_hash = hashlib.sha256()
+                read_layer_chunk = functools.partial(image_tar.extractfile(member).read, BUNDLE_CHUNK_SIZE)
+                for layer_chunk in iter(read_layer_chunk, b''):
+                    layer_hash.update(layer_chunk)
+                layer_files[f'sha256:{layer_hash.hexdigest()}'] = {'path': member.name, 'size': member.size}
+        return layer_files
+
+    def _load(self, manifest: dict, skipped_layer_paths: set):
+        with tqdm(desc='Importing Image', bar_format=self.BAR_FORMATTING, total=manifest['payload_size'],
+                  ncols=90, ascii=True) as progress_bar:
+            image_stream = self._read_decompressed_payload(manifest, on_read=progress_bar.update)
+            if skipped_layer_paths:
+                self._logger.debug(f'Skipping the layers present on the machine: {skipped_layer_paths}.')
+                image_stream = self._filter_image_tar(image_stream, skipped_layer_paths)
+            self._client.images.load(image_stream)
+
+    def _read_decompressed_payload(self, manifest: dict, on_read: Callable[[int], None]) -> Iterator[bytes]:
+        decompressor = self._get_codec(manifest['compression']).decompressor()
+        for compressed_chunk in self._read_payload(manifest):
+            on_read(len(compressed_chunk))
+            data = decompressor.decompress(compressed_chunk)
+            if data:
+                yield data
+        if hasattr(decompressor, 'flush'):
+            yield decompressor.flush()
+
+    def _read_payload(self, manifest: dict) -> Iterator[bytes]:
+        with open(self.path, 'rb') as bundle_file:
+            bundle_file.seek(manifest['payload_offset'])
+            remaining_size = manifest['payload_size']
+            while remaining_size > 0:
+                chunk = bundle_file.read(min(BUNDLE_CHUNK_SIZE, remaining_size))
+                if not chunk:
+                    raise ValueError(f'The bundle {self.path} is truncated')
+                remaining_size -= len(chunk)
+                yield chunk
+
+    def _is_payload_valid(self, manifest: dict) -> bool:
+        payload_hash = hashlib.sha256()
+        with tqdm(desc='Verifying Bundle', bar_format=self.BAR_FORMATTING, total=manifest['payload_size'],
+                  ncols=90, ascii=True) as progress_bar:
+            for chunk in self._read_payload(manifest):
+                payload_hash.update(chunk)
+                progress_bar.update(len(chunk))
+        return payload_hash.hexdigest() == manifest['payload_sha256']
+
+    def _get_present_layer_paths(self, manifest: dict, image_index: LocalImageIndex) -> set:
+        # Docker reuses a layer from the machine only if all the layers below it are present as well
+        bundle_diff_ids = [layer['diff_id'] for layer in manifest['layers']]
+        present_layers_number = image_index.get_longest_present_layer_chain(bundle_diff_ids)
+        return {layer['path'] for layer in manifest['layers'][:present_layers_number] if layer['path']}
+
+    def _filter_image_tar(self, image_stream: Iterable[bytes], skipped_paths: set) -> Iterator[bytes]:
+        output_queue = queue.Queue(maxsize=4)
+        stream_end = object()
+
+        def copy_members():
+            try:
+                with tarfile.open(fileobj=_TeeReader(image_stream, on_data=lambda _: None), mode='r|') as input_tar, \
+                        tarfile.open(fileobj=_QueueWriter(output_queue), mode='w|',
+                                     bufsize=BUNDLE_CHUNK_SIZE) as output_tar:
+                    for member in input_tar:
+                        if member.name in skipped_paths:
+                            continue
+                        output_tar.addfile(member, input_tar.extractfile(member) if member.isfile() else None)
+                output_queue.put(stream_end)
+            except Exception as error:
+                output_queue.put(error)
+
+        threading.Thread(target=copy_members, daemon=True).start()
+        while True:
+            data = output_queue.get()
+            if data is stream_end:
+                return
+            if isinstance(data, Exception):
+                raise data
+            yield data
+
+    @staticmethod
+    def _is_layer_file(member_name: str) -> bool:
+        # Legacy `docker save` layout keeps layers in `<id>/layer.tar`, the OCI layout keeps them in `blobs/`
+        return member_name.endswith('/layer.tar') or member_name.startswith('blobs/')
+
+    def _get_codec(self, compression: str):
+        if compression not in BUNDLE_CODECS:
+            raise ValueError(f'Unsupported bundle compression: {compression}')
+        if compression == 'zstd':
+            try:
+                import zstandard  # pylint: disable=import-outside-toplevel,unused-import
+            except ImportError:
+                self._logger.info('ERROR: The "zstandard" package is required for the zstd bundles. '
+                                  'Install it with the following command:'
+                                  '\n\n\tpython -m pip install zstandard'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+        return BUNDLE_CODECS[compression]
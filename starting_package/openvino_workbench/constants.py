@@ -23,7 +23,33 @@ import tempfile
 
 CLI_COMMAND = 'openvino-workbench'
 
-DOCKER_HUB_TAGS_URL = 'https://hub.docker.com/v2/repositories/openvino/workbench/tags'
+DOCKER_HUB_REGISTRY = 'docker.io'
+DOCKER_HUB_REGISTRY_API_HOST = 'registry-1.docker.io'
+
+# Seconds to establish a connection to the remote host and to wait for the registry to respond
+HTTP_CONNECT_TIMEOUT = 5
+REGISTRY_REQUEST_TIMEOUT = 10
+# Kept-alive connections per host shared by all the remote requests of the starter
+HTTP_CONNECTION_POOL_SIZE = 8
+# Retries of the failed connections and of the temporary errors of the remote hosts
+HTTP_MAX_RETRIES = 2
+HTTP_RETRY_BACKOFF_FACTOR = 0.5
+
+# Seconds to wait for a registry mirror to answer whether it has the requested image
+REGISTRY_MIRROR_PROBE_TIMEOUT = 3
+# The pull is considered stalled if the Docker daemon reports no progress for this number of seconds
+PULL_STALL_TIMEOUT = 60
+
+# Pull progress bar is redrawn at most once per interval (seconds)
+PULL_PROGRESS_REFRESH_INTERVAL = 0.2
+# Weight of the latest throughput sample in the estimation of the remaining time
+PULL_PROGRESS_EWMA_SMOOTHING = 0.3
+
+# Offline image bundles
+BUNDLE_MAGIC = b'OVWBNDL\x00'
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_CHUNK_SIZE = 2 * 1024 * 1024
+BUNDLE_GZIP_LEVEL = 6
 
 STARTED_DB_MESSAGE = 'PostgreSQL ready for start up'
 STARTED_NGINX_MESSAGE = 'Starting nginx nginx'
@@ -34,6 +60,61 @@ STAGE_COMPLETE_MESSAGES = (STARTED_DB_MESSAGE, STARTED_NGINX_MESSAGE, STARTED_CE
 
 PRE_STAGE_MESSAGES = ('Starting Database...', 'Starting Nginx...', 'Starting Celery...', 'Finishing up...')
 
+# Seconds every starting stage was given when the stages were polled one by one: 20 retries 7 seconds apart
+CONTAINER_STAGE_START_TIMEOUT = 140
+# Seconds to wait for all the starting stages to complete, the stages are not limited separately
+CONTAINER_START_TIMEOUT = CONTAINER_STAGE_START_TIMEOUT * len(STAGE_COMPLETE_MESSAGES)
+
+# Number of the last log lines read to find the finishing message, widened geometrically up to the maximum
+FINISHING_MESSAGE_INITIAL_TAIL = 64
+FINISHING_MESSAGE_MAX_TAIL = 4096
+
+# Attached container logs are written to the terminal in batches
+LOG_PUMP_FLUSH_INTERVAL = 0.1
+LOG_PUMP_BUFFER_SIZE = 64 * 1024
+
+# Rotation of the local copy of the container logs
+CONTAINER_LOG_FILE_MAX_SIZE_MB = 100
+CONTAINER_LOG_FILE_BACKUPS = 3
+
+# Startup probes that run concurrently before the container is started
+PREFLIGHT_MAX_WORKERS = 4
+
+# The NUMA node is selected by the starter if the `--numa-node` argument has this value
+AUTO_NUMA_NODE = 'auto'
+
+# Instances of the fleet that are started concurrently
+FLEET_MAX_WORKERS = 4
+
+# Labels of the pre-initialized stopped containers that are handed out on claim
+STANDBY_POOL_LABEL = 'openvino.workbench.standby'
+STANDBY_PORT_LABEL = 'openvino.workbench.standby.port'
+# Standbys are shared by the launches with any container name
+STANDBY_CONTAINER_NAME_PREFIX = 'workbench_standby_'
+# Seconds between the checks of the standby pool size
+STANDBY_POOL_REPLENISH_INTERVAL = 30
+# Arguments of the launch that the detached standby pool replenisher is not started with: the claim itself,
+# the bundle import as the imported image is passed by its reference, and the pulling options as the image is pulled
+STANDBY_REPLENISHER_SKIPPED_FLAGS = ('--claim', '--force-pull', '--show-layer-progress', '--refresh-metadata')
+STANDBY_REPLENISHER_SKIPPED_OPTIONS = ('--import-bundle', '--pull-report')
+
+# Labels of the images committed from the initialized containers
+BAKED_BASE_IMAGE_LABEL = 'openvino.workbench.baked.base'
+BAKED_CONFIG_LABEL = 'openvino.workbench.baked.config'
+BAKED_STARTUP_SECONDS_LABEL = 'openvino.workbench.baked.startup_seconds'
+
+# Labels of the named volumes with the DL Workbench data
+PERSISTENT_VOLUME_LABEL = 'openvino.workbench.volume'
+PERSISTENT_VOLUME_IMAGE_LABEL = 'openvino.workbench.volume.image'
+# Seconds given to the container to shut down the services before it is committed
+BAKE_STOP_TIMEOUT = 60
+
+# Cache of the registry metadata stored in the user cache directory
+STARTER_CACHE_DIRECTORY_NAME = 'openvino_workbench'
+REGISTRY_METADATA_CACHE_FILE_NAME = 'registry_metadata.json'
+REGISTRY_METADATA_CACHE_TTL = 3600
+REGISTRY_METADATA_CACHE_MAX_ENTRIES = 128
+
 DL_WB_LOGO = r'''
     ____  __       _       __           __   __                    __  
    / __ \/ /      | |     / /___  _____/ /__/ /_  ___  ____  _____/ /_ 
@@ -47,12 +128,64 @@ EXAMPLE_COMMAND = '\nCopy and run the following command to start the highest ava
 
 DL_WB_DOCKER_CONFIG_PATH = os.path.join('/home', 'workbench', '.workbench')
 
+# Benchmark of the assets directory file system
+ASSETS_DIRECTORY_BENCHMARK_WARN = 'warn'
+ASSETS_DIRECTORY_BENCHMARK_REFUSE = 'refuse'
+FS_BENCHMARK_TIME_BUDGET = 10
+FS_BENCHMARK_MAX_FILE_SIZE = 256 * 1024 ** 2
+FS_BENCHMARK_CHUNK_SIZE = 1024 ** 2
+# The sequential write is flushed every few chunks, so the time budget covers the flushed data
+FS_BENCHMARK_FSYNC_INTERVAL = 4 * 1024 ** 2
+FS_BENCHMARK_FSYNC_SAMPLES = 50
+FS_BENCHMARK_SMALL_FILES_NUMBER = 1000
+FS_BENCHMARK_SMALL_FILE_SIZE = 4096
+# Below these values the model import and the dataset extraction are noticeably slower than on a local disk
+FS_BENCHMARK_THRESHOLDS = {
+    'write_throughput': 50 * 1024 ** 2,
+    'read_throughput': 50 * 1024 ** 2,
+    'fsync_latency': 0.05,
+    'small_files_rate': 200,
+}
+# The last part of the type is compared, so `fuse.sshfs` matches `sshfs`
+NETWORK_FILESYSTEM_TYPES = ('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'sshfs', 'glusterfs', 'ceph', 'lustre', '9p',
+                            'afs', 'gcsfuse', 's3fs')
+
+HUGEPAGES_MOUNT_PATH = os.path.join('/dev', 'hugepages')
+
+# Share of the available memory that a tmpfs mount without the size takes
+DEFAULT_TMPFS_MEMORY_SHARE = 0.25
+# The scratch directories of the model conversion and calibration are mounted as tmpfs by `--scratch-tmpfs`,
+# every mount is limited by the share of the available memory. The tools create their intermediate files with
+# the Python `tempfile` module and the image does not set TMPDIR, so /tmp is the only scratch location. The other
+# writable directories hold the DL Workbench data that has to persist, /var/tmp is bound to the host for HDDL.
+SCRATCH_TMPFS_PROFILE = {
+    '/tmp': DEFAULT_TMPFS_MEMORY_SHARE,  # nosec
+}
+# All tmpfs mounts together cannot take more than this share of the available memory
+TMPFS_MAX_MEMORY_SHARE = 0.5
+# Used for the mounts without the size if the available memory is unknown, e.g. not on Linux
+DEFAULT_TMPFS_SIZE = '1g'
+DEFAULT_TMPFS_MODE = '1777'
+TMPFS_SIZE_GRANULARITY = 256 * 1024 ** 2
+
 INTERNAL_PORT = '5665'
+# In the host network mode the container listens on the host interfaces directly, without the docker-proxy
+HOST_NETWORK_MODE = 'host'
+BRIDGE_NETWORK_MODE = 'bridge'
+DEFAULT_PUBLIC_PORT = 5665
+# The host port is allocated by the starter if the `--port` argument has this value
+AUTO_PORT = 'auto'
+# Host ports suggested to the user or allocated by the starter
+PORT_ALLOCATION_RANGE = (5001, 5999)
+# Attempts to start the container on another port if the allocated one is taken in the meantime
+PORT_ALLOCATION_ATTEMPTS = 5
 
 COMMUNITY_LINK = 'https://community.intel.com/t5/Intel-Distribution-of-OpenVINO/bd-p/distribution-openvino-toolkit'
 
+PORT_IS_ALLOCATED_ERROR_PATTERN = r'port\sis\salready\sallocat|address\salready\sin\suse'
+
 DOCKER_ERROR_PATTERNS = {'Port is already allocated. Specify a different port using the "--port" argument':
-                             r'port\sis\salready\sallocat'}
+                             PORT_IS_ALLOCATED_ERROR_PATTERN}
 
 # Initialize logger
 _, LOG_FILE = tempfile.mkstemp(text=True, prefix='openvino_workbench_', suffix='.log')
@@ -19,24 +19,46 @@
 
 import logging
 import platform
-import random
 import re
 import sys
-import time
-from typing import Optional
+import threading
+from typing import Dict, Optional
 
 from docker import DockerClient
-from openvino_workbench.constants import (DL_WB_LOGO, PRE_STAGE_MESSAGES, STAGE_COMPLETE_MESSAGES,
-                                          WORKBENCH_READY_MESSAGE, LOG_FILE, EXAMPLE_COMMAND, INTERNAL_PORT,
-                                          ABORTING_EXIT_MESSAGE, CLI_COMMAND, LOGGER_NAME)
+from docker.errors import APIError, NotFound
+from openvino_workbench.constants import (DL_WB_LOGO, PRE_STAGE_MESSAGES, WORKBENCH_READY_MESSAGE, LOG_FILE,
+                                          EXAMPLE_COMMAND, INTERNAL_PORT, ABORTING_EXIT_MESSAGE, CLI_COMMAND,
+                                          LOGGER_NAME, FINISHING_MESSAGE_INITIAL_TAIL, FINISHING_MESSAGE_MAX_TAIL,
+                                          CONTAINER_LOG_FILE_MAX_SIZE_MB, PORT_ALLOCATION_ATTEMPTS,
+                                          PORT_IS_ALLOCATED_ERROR_PATTERN, HOST_NETWORK_MODE)
+from openvino_workbench.container_state import ContainerStateIndex
+from openvino_workbench.docker_config_creator import STARTER_ONLY_CONFIG_KEYS
+from openvino_workbench.log_pump import ContainerLogPump, RotatingLogFile
+from openvino_workbench.port_allocator import HostPortAllocator
+from openvino_workbench.readiness import ContainerReadinessWatcher, docker_timestamp_to_nanoseconds
+
+# Containers that are started concurrently should not create the same network twice
+_NETWORK_LOCK = threading.Lock()
+# IDs of the networks that are looked up or created by the starter, by the network name
+_NETWORK_IDS: Dict[str, str] = {}
 
 
 class DockerContainer:
-    def __init__(self, docker_client: DockerClient, config: dict):
+    def __init__(self, docker_client: DockerClient, config: dict, container_log_file: Optional[str] = None,
+                 container_log_file_max_size_mb: int = CONTAINER_LOG_FILE_MAX_SIZE_MB,
+                 port_allocator: Optional[HostPortAllocator] = None,
+                 state_index: Optional[ContainerStateIndex] = None):
         self._client = docker_client
         self._logger = logging.getLogger(LOGGER_NAME)
+        self._state_index = state_index or ContainerStateIndex(docker_client)
         self.config = config
-        self.container_name = self.config['name']
+        self._container_log_file = {'path': container_log_file,
+                                    'max_size': container_log_file_max_size_mb * 1024 * 1024}
+        # The public port is reallocated if it is taken before the container starts
+        self._port_allocator = port_allocator
+        # Seconds the container of the base image needs to become ready, known for the baked images
+        self.startup_baseline: Optional[float] = None
+        self.startup_duration: Optional[float] = None
         self._is_present = self._is_container_present()
         self._is_running = self._is_container_running()
 
@@ -76,17 +98,12 @@ class DockerContainer:
 
         self._logger.info('Starting the DL Workbench container...\n')
 
-        self._client.containers.run(**self.config)
+        self._run_container(network_name, network_alias)
 
-        for pre_message, complete_message in zip(PRE_STAGE_MESSAGES, STAGE_COMPLETE_MESSAGES):
-            self._wait_for_stage_to_complete(pre_message, re.compile(complete_message))
+        self._wait_for_container_to_be_ready()
 
         self._print_finishing_message(detached)
 
-        # Check for DL WB Docker network and create one if it does not exist
-        if 'CLOUD_SERVICE_URL' not in self.config['environment']:
-            self._connect_container_to_network(network_name, network_alias)
-
         self._set_running()
 
         if not detached:
@@ -95,10 +112,45 @@ class DockerContainer:
 
         self._logger.debug('Started container in the detached mode.')
 
+    def start_in_background(self, network_name: str, network_alias: str,
+                            stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Starts the container without the interactive output and returns whether it became ready.
+        The container is not started or is stopped right after the start if the stop event is set.
+        """
+        if stop_event and stop_event.is_set():
+            return False
+        self._logger.debug(f'Starting the container "{self.container_name}" in the background.')
+        self._run_container(network_name, network_alias)
+        # The start is interrupted while the container was being started, the caller might not know about it yet
+        if stop_event and stop_event.is_set():
+            self._logger.debug(f'Stopping the container "{self.container_name}" started after the interruption.')
+            self._client.api.stop(self.container_name)
+            return False
+        watcher = ContainerReadinessWatcher(docker_client=self._client, container_name=self.container_name)
+        if not watcher.wait_until_ready():
+            self._logger.debug(f'The container "{self.container_name}" did not become ready.')
+            return False
+        self.startup_duration = watcher.ready_duration
+        self._set_running()
+        return True
+
+    @property
+    def container_name(self) -> str:
+        return self.config['name']
+
+    @property
+    def public_port(self):
+        return self.config['environment']['PUBLIC_PORT']
+
+    @property
+    def finishing_message(self) -> str:
+        return self._get_finishing_message()
+
     def stop(self):
         self._logger.debug('Stopping the container...')
         self._logger.info('\nStopping the container...')
-        if not self._client.containers.list(filters={'name': self.container_name}):
+        if not self._state_index.is_running(self.container_name, refresh=True):
             self._logger.info('The specified container does not exist.')
             sys.exit(1)
         self._client.api.stop(self.container_name)
@@ -126,11 +178,12 @@ class DockerContainer:
 
         # Get and restart the container
         container = self._client.containers.get(self.container_name)
+        # Logs of the previous runs should not be scanned for the starting stages
+        log_cursor = self._get_previous_run_finish_time(container.attrs)
         container.start()
 
         # Wait for it to be ready
-        for pre_message, complete_message in zip(PRE_STAGE_MESSAGES, STAGE_COMPLETE_MESSAGES):
-            self._wait_for_stage_to_complete(pre_message, re.compile(complete_message))
+        self._wait_for_container_to_be_ready(log_cursor=log_cursor)
 
         self._print_finishing_message(is_detached)
 
@@ -141,13 +194,15 @@ class DockerContainer:
         self._attach_to_container_and_display_logs()
 
     def _get_public_port(self) -> Optional[str]:
+        if self._is_host_network():
+            return INTERNAL_PORT
         bound_ports = self._client.api.port(self.container_name, INTERNAL_PORT)
         if bound_ports:
             return bound_ports[0].get('HostPort')
         return None
 
     def _generate_container_name(self) -> Optional[str]:
-        all_taken_names = [container.name for container in self._client.containers.list(all=True)]
+        all_taken_names = self._state_index.get_names_with_prefix(f'{self.container_name}_')
         for idx in range(20):
             new_name = f'{self.container_name}_{idx}'
             if new_name not in all_taken_names:
@@ -155,33 +210,64 @@ class DockerContainer:
         return None
 
     def _generate_container_port(self) -> Optional[int]:
-        taken_port = self._get_public_port()
-        if taken_port:
-            for _ in range(50):
-                new_port = random.randint(5001, 5999)  # nosec
-                if new_port != int(taken_port):
-                    return new_port
-        return None
+        if self._is_host_network() or not self._get_public_port():
+            return None
+        return HostPortAllocator(self._client).allocate()
+
+    def _run_container(self, network_name: str, network_alias: str):
+        for attempt in range(1, PORT_ALLOCATION_ATTEMPTS + 1):
+            # The output options are used by `containers.run` only, the requested resources by the starter only
+            container = self._client.containers.create(**{key: value for key, value in self.config.items()
+                                                          if key not in STARTER_ONLY_CONFIG_KEYS})
+            # The container is attached to the DL WB Docker network before the start, so it is resolvable by the alias
+            # as soon as it starts
+            if self._is_network_managed():
+                self._connect_container_to_network(network_name, network_alias)
+            try:
+                container.start()
+                return
+            except APIError as error:
+                is_port_taken = re.search(PORT_IS_ALLOCATED_ERROR_PATTERN, str(error), re.IGNORECASE)
+                if not self._port_allocator or not is_port_taken or attempt == PORT_ALLOCATION_ATTEMPTS:
+                    raise
+                self._logger.debug(f'The port was taken before the container started, attempt {attempt}.',
+                                   exc_info=True)
+
+            # The container is created before the port is bound, so it has to be removed to reuse the name
+            self._client.api.remove_container(self.container_name, force=True)
+            ip_address, taken_port = self.config['ports'][INTERNAL_PORT]
+            new_port = self._port_allocator.allocate()
+            if new_port is None:
+                self._logger.info(f'ERROR: There are no free ports on the machine.{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+            self._logger.info(f'The port {taken_port} is already allocated, using the port {new_port}.')
+            self.config['ports'][INTERNAL_PORT] = (ip_address, new_port)
+            self.config['environment']['PUBLIC_PORT'] = new_port
 
     def _is_container_present(self) -> bool:
-        return any(self.container_name == container.name for container in self._client.containers.list(all=True))
+        return self._state_index.is_present(self.container_name)
 
     def _is_container_running(self) -> bool:
-        return any(self.container_name == container.name for container in self._client.containers.list())
-
-    def _wait_for_stage_to_complete(self, pre_message: str,
-                                    stage_complete_pattern):
-        max_retries = 20
-
-        print(pre_message, end=' ', flush=True)
-
-        for _ in range(max_retries):
-            time.sleep(7)
-            current_log = self._get_docker_logs_since(seconds=20)
-
-            if stage_complete_pattern.search(current_log):
-                break
-        else:
+        return self._state_index.is_running(self.container_name)
+
+    @staticmethod
+    def _get_previous_run_finish_time(container_attributes: dict) -> Optional[int]:
+        finished_at = container_attributes.get('State', {}).get('FinishedAt')
+        # Docker reports zero time for containers that have never been stopped
+        if not finished_at or finished_at.startswith('0001-01-01'):
+            return None
+        return docker_timestamp_to_nanoseconds(finished_at)
+
+    def _wait_for_container_to_be_ready(self, log_cursor: Optional[int] = None):
+        def report_stage_complete(stage_index: int):
+            print('done')
+            if stage_index + 1 < len(PRE_STAGE_MESSAGES):
+                print(PRE_STAGE_MESSAGES[stage_index + 1], end=' ', flush=True)
+
+        print(PRE_STAGE_MESSAGES[0], end=' ', flush=True)
+
+        watcher = ContainerReadinessWatcher(docker_client=self._client, container_name=self.container_name)
+        if not watcher.wait_until_ready(log_cursor=log_cursor, on_stage_complete=report_stage_complete):
             self._logger.debug('Could not start the container.')
             logs = self._client.api.logs(container=self.container_name).decode('utf-8')
             self._logger.info(f'\nERROR: Could not start the container. '
@@ -190,19 +276,17 @@ class DockerContainer:
             self._logger.debug(f'CONTAINER LOGS\n: {logs}.')
             sys.exit(1)
 
-        self._logger.debug(f'Container starting stage with message {stage_complete_pattern.pattern} is complete.')
-
-        print('done')
+        self.startup_duration = watcher.ready_duration
+        self._logger.debug(f'The container became ready in {self.startup_duration:.1f} seconds.')
+        if self.startup_baseline:
+            self._logger.info(f'The pre-initialized image saved {self.startup_baseline - self.startup_duration:.1f} '
+                              f'seconds of the container start.')
 
     def _print_finishing_message(self, detached: bool):
         self._logger.info(DL_WB_LOGO)
 
         # Show finishing message from the container logs
-        container = self._client.containers.get(self.container_name)
-        all_logs = container.logs().decode('utf-8').rstrip()
-        finishing_message_start = all_logs.rfind(WORKBENCH_READY_MESSAGE)
-        self._logger.info(f'\n{all_logs[finishing_message_start:]}')
-        del all_logs
+        self._logger.info(f'\n{self._get_finishing_message()}')
 
         if detached:
             self._logger.info('\nDL Workbench is started in the detached mode. '
@@ -216,28 +300,64 @@ class DockerContainer:
 
         self._logger.debug('Finish message was printed.')
 
-    def _is_network_present(self, network: str) -> bool:
-        return bool(self._client.api.networks(names=[network]))
+    def _get_finishing_message(self) -> str:
+        tail = FINISHING_MESSAGE_INITIAL_TAIL
+        while tail <= FINISHING_MESSAGE_MAX_TAIL:
+            logs = self._client.api.logs(container=self.container_name, tail=tail).decode('utf-8', errors='replace')
+            logs = logs.rstrip()
+            finishing_message_start = logs.rfind(WORKBENCH_READY_MESSAGE)
+            if finishing_message_start != -1:
+                return logs[finishing_message_start:]
+            # The whole log is already read
+            if logs.count('\n') + 1 < tail:
+                break
+            tail *= 4
+        self._logger.debug('Could not find the finishing message in the container logs.')
+        return ''
+
+    def _is_host_network(self) -> bool:
+        return self.config.get('network_mode') == HOST_NETWORK_MODE
+
+    def _is_network_managed(self) -> bool:
+        # The DevCloud network is set in the config, the host network cannot be combined with other networks
+        return 'CLOUD_SERVICE_URL' not in self.config.get('environment', {}) and not self._is_host_network()
+
+    def _get_network_id(self, network_name: str) -> str:
+        """Returns the ID of the network, creates the network if it does not exist"""
+        with _NETWORK_LOCK:
+            if network_name not in _NETWORK_IDS:
+                # The name filter matches the substrings of the names
+                networks = [network for network in self._client.api.networks(names=[network_name])
+                            if network['Name'] == network_name]
+                if networks:
+                    _NETWORK_IDS[network_name] = networks[0]['Id']
+                else:
+                    _NETWORK_IDS[network_name] = self._client.api.create_network(name=network_name,
+                                                                                 driver='bridge')['Id']
+            return _NETWORK_IDS[network_name]
 
     def _connect_container_to_network(self,
                                       network_name: str,
                                       network_alias: str):
-        if not self._is_network_present(network_name):
-            net = self._client.networks.create(name=network_name, driver='bridge')
-        else:
-            net_id = self._client.api.networks(names=[network_name])[0]['Id']
-            net = self._client.networks.get(network_id=net_id)
-
-        net.connect(container=self.container_name, aliases=[network_alias])
-
-    def _get_docker_logs_since(self, seconds: int) -> str:
-        return self._client.api.logs(container=self.container_name,
-                                     since=int(time.time()) - seconds).decode('utf-8')
+        try:
+            self._client.api.connect_container_to_network(self.container_name, self._get_network_id(network_name),
+                                                          aliases=[network_alias])
+        except NotFound:
+            # The network was removed after it was looked up
+            self._logger.debug(f'The network "{network_name}" is not found, looking it up again.', exc_info=True)
+            with _NETWORK_LOCK:
+                _NETWORK_IDS.pop(network_name, None)
+            self._client.api.connect_container_to_network(self.container_name, self._get_network_id(network_name),
+                                                          aliases=[network_alias])
 
     def _attach_to_container_and_display_logs(self):
         self._logger.debug('Attaching to the container to display logs.')
-        for log in self._client.api.attach(container=self.container_name, stream=True):
-            print(log.decode('utf-8'), sep='', end='')
+        log_file = None
+        if self._container_log_file['path']:
+            self._logger.debug(f'Saving the container logs to the file: {self._container_log_file["path"]}.')
+            log_file = RotatingLogFile(**self._container_log_file)
+        log_pump = ContainerLogPump(log_file=log_file)
+        log_pump.pump(self._client.api.attach(container=self.container_name, stream=True))
 
     def _set_present(self):
         self._is_present = True
@@ -0,0 +1,133 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ State of the Docker containers on the machine
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import re
+import threading
+from typing import Dict, Optional, Set
+
+from docker import DockerClient
+from docker.errors import NotFound
+from openvino_workbench.constants import LOGGER_NAME
+
+# Statuses of the containers after the Docker events
+EVENT_STATUSES = {'create': 'created', 'start': 'running', 'unpause': 'running', 'pause': 'paused',
+                  'die': 'exited', 'destroy': None}
+
+
+class ContainerStateIndex:
+    """
+    Answers whether a container with the name is present and running with a single inspect call
+    instead of listing all the containers, the answers are cached.
+    While the index watches the Docker events, the cached answers are kept up to date from the events,
+    otherwise they are requested again on refresh.
+    """
+
+    def __init__(self, docker_client: DockerClient):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        # Container status keyed by the name, None if there is no container with the name
+        self._statuses: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._events = None
+        self._watcher: Optional[threading.Thread] = None
+        # Set on every container event while watching
+        self._changed = threading.Event()
+
+    @property
+    def is_watching(self) -> bool:
+        return self._watcher is not None and self._watcher.is_alive()
+
+    def get_status(self, container_name: str, refresh: bool = False) -> Optional[str]:
+        with self._lock:
+            if container_name in self._statuses and not (refresh and not self.is_watching):
+                return self._statuses[container_name]
+        status = self._inspect_status(container_name)
+        with self._lock:
+            self._statuses[container_name] = status
+        return status
+
+    def is_present(self, container_name: str, refresh: bool = False) -> bool:
+        return self.get_status(container_name, refresh) is not None
+
+    def is_running(self, container_name: str, refresh: bool = False) -> bool:
+        return self.get_status(container_name, refresh) == 'running'
+
+    def get_names_with_prefix(self, prefix: str) -> Set[str]:
+        """Returns names of all the containers that start with the prefix using a single filtered listing"""
+        # Docker matches the name filter as a regular expression against the names starting with a slash
+        containers = self._client.api.containers(all=True, filters={'name': f'^/{re.escape(prefix)}'})
+        return {name.lstrip('/') for container in containers for name in container.get('Names') or []}
+
+    def watch(self):
+        """Follows the Docker events in a background thread to keep the statuses up to date"""
+        if self.is_watching:
+            return
+        self._events = self._client.events(decode=True, filters={'type': 'container'})
+        self._watcher = threading.Thread(target=self._follow_events, daemon=True)
+        self._watcher.start()
+        self._logger.debug('Started watching the container events.')
+
+    def stop_watching(self):
+        if self._events is not None:
+            self._events.close()
+        self._events = None
+        self._logger.debug('Stopped watching the container events.')
+
+    def wait_for_change(self, timeout: float) -> bool:
+        """Waits for a container event while watching, returns whether any container changed"""
+        is_changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return is_changed
+
+    def wake_waiters(self):
+        """Releases the threads waiting for a change, e.g. on stop"""
+        self._changed.set()
+
+    def _inspect_status(self, container_name: str) -> Optional[str]:
+        try:
+            container_info = self._client.api.inspect_container(container_name)
+        except NotFound:
+            return None
+        # Docker also looks up containers by the ID prefix
+        if container_info.get('Name', '').lstrip('/') != container_name:
+            return None
+        return container_info['State']['Status']
+
+    def _follow_events(self):
+        try:
+            for event in self._events:
+                action = event.get('Action') or event.get('status', '')
+                attributes = event.get('Actor', {}).get('Attributes', {})
+                container_name = attributes.get('name')
+                if not container_name:
+                    continue
+                with self._lock:
+                    if action == 'rename':
+                        self._statuses.pop(attributes.get('oldName', '').lstrip('/'), None)
+                        self._statuses.pop(container_name, None)
+                    elif action in EVENT_STATUSES:
+                        self._statuses[container_name] = EVENT_STATUSES[action]
+                self._changed.set()
+        except Exception:
+            # The stream is closed on stop
+            self._logger.debug('The container events stream is closed.', exc_info=True)
+        # Statuses are not followed anymore
+        with self._lock:
+            self._statuses.clear()
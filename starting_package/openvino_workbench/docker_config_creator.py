@@ -17,20 +17,63 @@
  limitations under the License.
 """
 
+import copy
+import hashlib
+import json
 import logging
 import os
 import platform
+import posixpath
 import random
 import string
 import sys
 from argparse import Namespace
 from pathlib import Path
 
+from docker.errors import DockerException
+from docker.types import Ulimit
+from docker.utils import parse_bytes
 from openvino_workbench.constants import (DL_WB_DOCKER_CONFIG_PATH,
                                           INTERNAL_PORT,
                                           ABORTING_EXIT_MESSAGE,
                                           CLI_COMMAND,
-                                          LOGGER_NAME)
+                                          LOGGER_NAME,
+                                          AUTO_NUMA_NODE,
+                                          HUGEPAGES_MOUNT_PATH,
+                                          HOST_NETWORK_MODE,
+                                          ASSETS_DIRECTORY_BENCHMARK_REFUSE,
+                                          SCRATCH_TMPFS_PROFILE,
+                                          TMPFS_MAX_MEMORY_SHARE,
+                                          DEFAULT_TMPFS_SIZE,
+                                          DEFAULT_TMPFS_MEMORY_SHARE,
+                                          TMPFS_SIZE_GRANULARITY,
+                                          DEFAULT_TMPFS_MODE)
+from openvino_workbench.fs_benchmark import FilesystemBenchmark, is_network_filesystem
+from openvino_workbench.host_resources import (read_numa_topology, select_numa_node, format_cpu_list, parse_cpu_list,
+                                               read_meminfo)
+
+# Keys of the config that differ between the containers started with the same arguments
+INSTANCE_SPECIFIC_CONFIG_KEYS = ('name', 'ports', 'labels')
+# Keys of the config that are resolved from the current state of the machine, e.g. the available memory
+# or the NUMA node with the most free memory, so they differ between the launches with the same arguments
+HOST_DEPENDENT_CONFIG_KEYS = ('cpuset_cpus', 'cpuset_mems', 'tmpfs')
+# The arguments the host dependent keys are resolved from, the key is used by the starter only
+REQUESTED_HOST_RESOURCES_CONFIG_KEY = 'requested_host_resources'
+# Keys of the config that are not passed to Docker when the container is created
+STARTER_ONLY_CONFIG_KEYS = ('stdout', 'stderr', REQUESTED_HOST_RESOURCES_CONFIG_KEY)
+
+
+def get_config_hash(config: dict) -> str:
+    """
+    Returns a short hash of the config that does not depend on the container name and the host port.
+    The host dependent keys are represented by the requested arguments, so the hash is stable between launches.
+    """
+    shared_config = {key: value for key, value in config.items()
+                     if key not in INSTANCE_SPECIFIC_CONFIG_KEYS + HOST_DEPENDENT_CONFIG_KEYS}
+    shared_config['environment'] = copy.copy(shared_config.get('environment', {}))
+    shared_config['environment'].pop('PUBLIC_PORT', None)
+    serialized_config = json.dumps(shared_config, sort_keys=True, default=str)
+    return hashlib.sha256(serialized_config.encode('utf-8')).hexdigest()[:12]
 
 
 class DockerConfigCreator:
@@ -57,7 +100,12 @@ class DockerConfigCreator:
                        'stderr': True,
                        'stdout': True,
                        'detach': True,
-                       'tty': True}
+                       'tty': True,
+                       REQUESTED_HOST_RESOURCES_CONFIG_KEY: {'numa_node': self._arguments.numa_node,
+                                                             'cpuset_cpus': self._arguments.cpuset_cpus,
+                                                             'cpuset_mems': self._arguments.cpuset_mems,
+                                                             'tmpfs_mounts': self._arguments.tmpfs_mounts,
+                                                             'scratch_tmpfs': self._arguments.scratch_tmpfs}}
 
         # Authentication
         if self._arguments.enable_authentication:
@@ -95,6 +143,12 @@ class DockerConfigCreator:
         if self._arguments.enable_gpu:
             self._add_gpu_specific_params()
 
+        # CPU
+        self._add_cpu_specific_params()
+
+        # Memory
+        self._add_memory_specific_params()
+
         # Mount assets directory
         if self._arguments.assets_directory:
 
@@ -123,6 +177,18 @@ class DockerConfigCreator:
                 self.config['environment']['SSL_CERT'] = os.path.join(DL_WB_DOCKER_CONFIG_PATH,
                                                                       self._arguments.ssl_certificate_name)
 
+        # Named volume
+        if self._arguments.persistent_volume:
+            self._add_persistent_volume()
+
+        # tmpfs
+        if self._arguments.tmpfs_mounts or self._arguments.scratch_tmpfs:
+            self._add_tmpfs_mounts()
+
+        # Network
+        if self._arguments.network_mode == HOST_NETWORK_MODE:
+            self._add_host_network_params()
+
         # DevCloud
         if self._arguments.cloud_service_address:
             self.config['environment']['CLOUD_SERVICE_URL'] = self._arguments.cloud_service_address
@@ -169,8 +235,34 @@ class DockerConfigCreator:
                     f'{ABORTING_EXIT_MESSAGE}')
             sys.exit(1)
 
+        if self._arguments.assets_directory_benchmark:
+            self._benchmark_assets_directory()
+
         return self._arguments.assets_directory
 
+    def _benchmark_assets_directory(self):
+        self._logger.info(f'Checking the performance of the assets directory: {self._arguments.assets_directory}...')
+        try:
+            results = FilesystemBenchmark(directory=self._arguments.assets_directory).run()
+        except OSError:
+            self._logger.debug('Could not benchmark the assets directory.', exc_info=True)
+            self._logger.info('WARNING: Could not check the performance of the assets directory.')
+            return
+        self._logger.info(f'Assets directory {FilesystemBenchmark.format_results(results)}.')
+
+        failed_checks = FilesystemBenchmark.get_failed_checks(results)
+        if not failed_checks:
+            return
+        network_filesystem_message = (f' It is on the network file system "{results["filesystem_type"]}", '
+                                      'use a local directory for better performance.'
+                                      if is_network_filesystem(results['filesystem_type']) else '')
+        message = (f'The assets directory is too slow for DL Workbench: {"; ".join(failed_checks)}.'
+                   f'{network_filesystem_message}')
+        if self._arguments.assets_directory_benchmark == ASSETS_DIRECTORY_BENCHMARK_REFUSE:
+            self._logger.info(f'ERROR: {message}{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+        self._logger.info(f'WARNING: {message} Model import and dataset extraction might be slow.\n')
+
     def _is_dir_writable_linux(self) -> bool:
         permissions = oct(os.stat(self._arguments.assets_directory).st_mode)[-1]
         return permissions == '7'
@@ -208,10 +300,12 @@ class DockerConfigCreator:
         if ion_device.exists():
             self._add_device_to_config('/dev/ion')
 
-        self.config['volumes'] = {
+        if 'volumes' not in self.config:
+            self.config['volumes'] = {}
+        self.config['volumes'].update({
             '/var/tmp': {'bind': '/var/tmp', 'mode': 'rw'},  # nosec
             '/dev/shm': {'bind': '/dev/shm', 'mode': 'rw'}  # nosec
-        }
+        })
 
     def _add_gpu_specific_params(self):
         if 'group_add' not in self.config:
@@ -226,6 +320,171 @@ class DockerConfigCreator:
             self.config['group_add'].append(group_id)
         self._add_device_to_config('/dev/dri')
 
+    def _add_cpu_specific_params(self):
+        if self._arguments.numa_node is not None:
+            topology = read_numa_topology()
+            if self._arguments.numa_node == AUTO_NUMA_NODE:
+                numa_node = select_numa_node(topology)
+                self._logger.debug(f'Selected the NUMA node {numa_node} of the topology: {topology}.')
+            else:
+                numa_node = int(self._arguments.numa_node)
+            if numa_node not in topology:
+                self._logger.info(f'ERROR: There is no NUMA node {numa_node} with CPUs on the machine. '
+                                  f'Available nodes: {", ".join(map(str, sorted(topology)))}.'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+            self.config['cpuset_cpus'] = format_cpu_list(topology[numa_node]['cpus'])
+            self.config['cpuset_mems'] = str(numa_node)
+
+        if self._arguments.cpuset_cpus:
+            self._check_cpus_are_present(self._arguments.cpuset_cpus)
+            self.config['cpuset_cpus'] = self._arguments.cpuset_cpus
+        if self._arguments.cpuset_mems:
+            self.config['cpuset_mems'] = self._arguments.cpuset_mems
+        if self._arguments.cpu_shares:
+            self.config['cpu_shares'] = self._arguments.cpu_shares
+        if self._arguments.cpus:
+            available_cpus_number = os.cpu_count()
+            if not 0 < self._arguments.cpus <= available_cpus_number:
+                self._logger.info(f'ERROR: The number of CPUs should be between 0 and {available_cpus_number}.'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+            self.config['nano_cpus'] = int(self._arguments.cpus * 10 ** 9)
+
+    def _add_host_network_params(self):
+        # The container listens on all the interfaces of the machine, the ports are not published
+        if self._arguments.ip != '0.0.0.0':  # nosec
+            self._logger.info(f'WARNING: "--ip" is not applied in the "{HOST_NETWORK_MODE}" network mode.')
+        del self.config['ports']
+        # The container uses the hostname of the machine
+        del self.config['hostname']
+        self.config['network_mode'] = HOST_NETWORK_MODE
+
+    def _add_memory_specific_params(self):
+        meminfo = read_meminfo()
+        total_memory = meminfo.get('MemTotal')
+        memory_sizes = {}
+        for argument_name, config_key in (('shm_size', 'shm_size'), ('memory', 'mem_limit'),
+                                          ('memory_reservation', 'mem_reservation'),
+                                          ('memory_swap', 'memswap_limit')):
+            value = getattr(self._arguments, argument_name)
+            if not value:
+                continue
+            size = -1 if argument_name == 'memory_swap' and value == '-1' else self._parse_memory_size(value)
+            # The containers of Docker Desktop use the memory of the virtual machine, not of the host
+            if total_memory and size > total_memory:
+                self._exit_with_memory_error(f'The "--{argument_name.replace("_", "-")}" value {value} exceeds '
+                                             f'the memory of the machine: {total_memory // 1024 ** 2} MB.')
+            memory_sizes[argument_name] = size
+            self.config[config_key] = size
+
+        if 'memory_swap' in memory_sizes and 'memory' not in memory_sizes:
+            self._exit_with_memory_error('"--memory-swap" requires "--memory".')
+        if memory_sizes.get('memory_swap', -1) != -1 and memory_sizes['memory_swap'] < memory_sizes['memory']:
+            self._exit_with_memory_error('"--memory-swap" should not be less than "--memory".')
+        if 'memory' in memory_sizes and memory_sizes.get('memory_reservation', 0) > memory_sizes['memory']:
+            self._exit_with_memory_error('"--memory-reservation" should not exceed "--memory".')
+        # The shared memory is accounted in the memory of the container
+        if 'memory' in memory_sizes and memory_sizes.get('shm_size', 0) > memory_sizes['memory']:
+            self._logger.info('WARNING: "--shm-size" exceeds "--memory", the shared memory is limited by the memory '
+                              'of the container.')
+        available_memory = meminfo.get('MemAvailable')
+        if available_memory and memory_sizes.get('memory_reservation', 0) > available_memory:
+            self._logger.info(f'WARNING: "--memory-reservation" exceeds the available memory of the machine: '
+                              f'{available_memory // 1024 ** 2} MB.')
+        if 'shm_size' in memory_sizes and self._arguments.enable_hddl:
+            self._logger.info('WARNING: The host "/dev/shm" is mounted for HDDL, "--shm-size" is not applied.')
+
+        ulimits = []
+        if self._arguments.ulimit_memlock:
+            memlock = (-1 if self._arguments.ulimit_memlock == 'unlimited'
+                       else self._parse_memory_size(self._arguments.ulimit_memlock))
+            ulimits.append(Ulimit(name='memlock', soft=memlock, hard=memlock))
+        if self._arguments.ulimit_nofile:
+            ulimits.append(Ulimit(name='nofile', soft=self._arguments.ulimit_nofile,
+                                  hard=self._arguments.ulimit_nofile))
+        if ulimits:
+            self.config['ulimits'] = ulimits
+
+        if self._arguments.hugepages:
+            if meminfo and not meminfo.get('HugePages_Total') or not os.path.isdir(HUGEPAGES_MOUNT_PATH):
+                self._exit_with_memory_error('There are no hugepages reserved on the machine. Reserve them with '
+                                             '"sysctl vm.nr_hugepages=<number>" and try again.')
+            if 'volumes' not in self.config:
+                self.config['volumes'] = {}
+            self.config['volumes'][HUGEPAGES_MOUNT_PATH] = {'bind': HUGEPAGES_MOUNT_PATH, 'mode': 'rw'}
+
+    def _add_persistent_volume(self):
+        if 'volumes' not in self.config:
+            self.config['volumes'] = {}
+        self.config['volumes'][self._arguments.persistent_volume] = {'bind': DL_WB_DOCKER_CONFIG_PATH, 'mode': 'rw'}
+
+    def _add_tmpfs_mounts(self):
+        available_memory = read_meminfo().get('MemAvailable')
+
+        def get_default_size(memory_share: float) -> int:
+            if not available_memory:
+                return parse_bytes(DEFAULT_TMPFS_SIZE)
+            # The size is rounded down to whole granules, at least one
+            return max(int(available_memory * memory_share) // TMPFS_SIZE_GRANULARITY, 1) * TMPFS_SIZE_GRANULARITY
+
+        tmpfs_mounts = {}
+        if self._arguments.scratch_tmpfs:
+            for path, memory_share in SCRATCH_TMPFS_PROFILE.items():
+                tmpfs_mounts[path] = (get_default_size(memory_share), DEFAULT_TMPFS_MODE)
+        # The explicit mounts override the profile
+        for tmpfs_mount in self._arguments.tmpfs_mounts or []:
+            path, _, size_and_mode = tmpfs_mount.partition(':')
+            size, _, mode = size_and_mode.partition(':')
+            size = self._parse_memory_size(size) if size else get_default_size(DEFAULT_TMPFS_MEMORY_SHARE)
+            tmpfs_mounts[posixpath.normpath(path)] = (size, mode or DEFAULT_TMPFS_MODE)
+
+        mounted_paths = [volume['bind'] for volume in self.config.get('volumes', {}).values()]
+        for path in tmpfs_mounts:
+            if path in mounted_paths:
+                self._exit_with_memory_error(f'The directory "{path}" is already mounted, it cannot be a tmpfs.')
+
+        # The files in tmpfs hold the memory until they are deleted, so the mounts are limited by the available memory
+        total_size = sum(size for size, _ in tmpfs_mounts.values())
+        if available_memory and total_size > available_memory * TMPFS_MAX_MEMORY_SHARE:
+            self._exit_with_memory_error(f'The tmpfs mounts take {total_size // 1024 ** 2} MB that exceeds '
+                                         f'{TMPFS_MAX_MEMORY_SHARE:.0%} of the available memory: '
+                                         f'{available_memory // 1024 ** 2} MB. Specify smaller sizes.')
+        if self.config.get('mem_limit') and total_size >= self.config['mem_limit']:
+            self._logger.info('WARNING: The tmpfs mounts are accounted in "--memory" and can take all the memory '
+                              'of the container.')
+
+        self.config['tmpfs'] = {path: f'size={size},mode={mode}' for path, (size, mode) in tmpfs_mounts.items()}
+
+    def _parse_memory_size(self, size: str) -> int:
+        try:
+            return parse_bytes(size)
+        except DockerException:
+            self._exit_with_memory_error(f'The memory size "{size}" is incorrect. Format: 512m, 16g')
+            raise
+
+    def _exit_with_memory_error(self, message: str):
+        self._logger.debug(f'Incorrect memory arguments: {message}')
+        self._logger.info(f'ERROR: {message}{ABORTING_EXIT_MESSAGE}')
+        sys.exit(1)
+
+    def _check_cpus_are_present(self, cpu_list: str):
+        try:
+            requested_cpus = set(parse_cpu_list(cpu_list))
+        except ValueError:
+            requested_cpus = None
+        if not requested_cpus:
+            self._logger.info(f'ERROR: The CPU list "{cpu_list}" is incorrect. Format: 0-3,8-11'
+                              f'{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+        available_cpus = {cpu for node in read_numa_topology().values() for cpu in node['cpus']}
+        missing_cpus = requested_cpus - available_cpus
+        if missing_cpus and self._user_os == 'Linux':
+            self._logger.info(f'ERROR: The CPUs {format_cpu_list(sorted(missing_cpus))} are not available '
+                              f'on the machine. Available CPUs: {format_cpu_list(sorted(available_cpus))}.'
+                              f'{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+
     @staticmethod
     def _get_group_id(group: str) -> int:
         import grp
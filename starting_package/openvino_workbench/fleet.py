@@ -0,0 +1,198 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Concurrent start of several DL Workbench instances
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import copy
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+
+from docker import DockerClient
+from openvino_workbench.constants import (LOGGER_NAME, ABORTING_EXIT_MESSAGE, INTERNAL_PORT, FLEET_MAX_WORKERS,
+                                          AUTO_NUMA_NODE)
+from openvino_workbench.container import DockerContainer
+from openvino_workbench.container_state import ContainerStateIndex
+from openvino_workbench.host_resources import parse_cpu_list, read_numa_topology, split_cpu_sets
+from openvino_workbench.port_allocator import HostPortAllocator
+
+FLEET_MANIFEST_KEYS = ('name', 'port')
+
+
+def read_fleet_manifest(path: str) -> List[dict]:
+    logger = logging.getLogger(LOGGER_NAME)
+    try:
+        with open(path, encoding='utf-8') as manifest_file:
+            instances = json.load(manifest_file)
+        if not isinstance(instances, list) or not all(isinstance(instance, dict) and instance.get('name')
+                                                      and set(instance) <= set(FLEET_MANIFEST_KEYS)
+                                                      for instance in instances):
+            raise ValueError('The manifest should be a list of objects with the "name" and optional "port" keys.')
+    except (OSError, ValueError) as error:
+        logger.debug(f'Could not read the fleet manifest: {path}.', exc_info=True)
+        logger.info(f'ERROR: Could not read the fleet manifest: {path}. {error}'
+                    f'{ABORTING_EXIT_MESSAGE}')
+        sys.exit(1)
+    return instances
+
+
+class WorkbenchFleet:
+    """
+    Starts several DL Workbench instances from the same image and base config in the detached mode.
+    Names and ports of all the instances are allocated at once, then the containers are started concurrently
+    and every instance is reported as soon as it becomes ready.
+    """
+
+    def __init__(self, docker_client: DockerClient, base_config: dict, port_allocator: HostPortAllocator,
+                 state_index: Optional[ContainerStateIndex] = None, max_workers: int = FLEET_MAX_WORKERS):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.base_config = base_config
+        self._port_allocator = port_allocator
+        self._state_index = state_index or ContainerStateIndex(docker_client)
+        self.max_workers = max_workers
+        self.containers: List[DockerContainer] = []
+        # Set on interruption, so the workers do not start the instances that are not started yet
+        self._stop_event = threading.Event()
+
+    def plan_instances(self, instances_number: Optional[int] = None,
+                       manifest_instances: Optional[List[dict]] = None,
+                       preferred_port: Optional[int] = None, numa_node: Optional[str] = None,
+                       cpuset_cpus: Optional[str] = None) -> List[dict]:
+        if manifest_instances is not None:
+            instances = [dict(instance) for instance in manifest_instances]
+            taken_names = [instance['name'] for instance in instances
+                           if self._state_index.is_present(instance['name'])]
+            if taken_names:
+                self._logger.info(f'ERROR: Containers with the names {", ".join(taken_names)} are present '
+                                  'on the machine. Specify other names in the fleet manifest.'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+        else:
+            instances = [{'name': name} for name in self._get_free_names(instances_number)]
+
+        ports_to_allocate = sum('port' not in instance for instance in instances)
+        ports = iter(self._port_allocator.allocate_many(ports_to_allocate, preferred_port))
+        for instance in instances:
+            if 'port' not in instance:
+                instance['port'] = next(ports, None)
+            if instance['port'] is None:
+                self._logger.info(f'ERROR: There are not enough free ports on the machine for the fleet.'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+
+        # Every instance gets its own CPUs, so the benchmarks of the instances do not interfere
+        if numa_node is not None or cpuset_cpus:
+            topology = read_numa_topology()
+            node_ids = None if numa_node in (None, AUTO_NUMA_NODE) else [int(numa_node)]
+            cpus = parse_cpu_list(cpuset_cpus) if cpuset_cpus else None
+            cpu_sets = split_cpu_sets(topology, len(instances), node_ids=node_ids, cpus=cpus)
+            if not cpu_sets:
+                self._logger.info(f'ERROR: There are not enough CPUs to pin {len(instances)} instances separately.'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+            for instance, (instance_cpus, instance_memory_nodes) in zip(instances, cpu_sets):
+                instance['cpuset_cpus'] = instance_cpus
+                instance['cpuset_mems'] = instance_memory_nodes
+        return instances
+
+    def start(self, instances: List[dict], network_name: str) -> bool:
+        self.containers = [DockerContainer(docker_client=self._client, config=self._create_instance_config(instance),
+                                           port_allocator=self._port_allocator, state_index=self._state_index)
+                           for instance in instances]
+        instances_description = ', '.join(f'{container.container_name} (port {container.public_port})'
+                                          for container in self.containers)
+        self._logger.info(f'Starting {len(self.containers)} DL Workbench instances: {instances_description}\n')
+
+        # The statuses of the instances are kept from the container events instead of inspecting them on stop
+        self._state_index.watch()
+        started_at = time.monotonic()
+        failed_containers = []
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fleet')
+        futures = {executor.submit(container.start_in_background, network_name, container.container_name,
+                                   self._stop_event): container for container in self.containers}
+        try:
+            for future in as_completed(futures):
+                container = futures[future]
+                try:
+                    is_ready = future.result()
+                except Exception:
+                    self._logger.debug(f'Could not start the instance "{container.container_name}".', exc_info=True)
+                    is_ready = False
+                if not is_ready:
+                    failed_containers.append(container.container_name)
+                    self._logger.info(f'ERROR: The instance "{container.container_name}" could not start.')
+                    continue
+                self._logger.info(f'The instance "{container.container_name}" is ready in '
+                                  f'{time.monotonic() - started_at:.1f} seconds: '
+                                  f'http://127.0.0.1:{container.public_port}\n{container.finishing_message}\n')
+        finally:
+            # The queued instances are cancelled on interruption, the instances that are being started are stopped
+            # by the workers or by `stop`, so the workers finish without waiting for them to become ready
+            self._stop_event.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        # On interruption the statuses are still followed for `stop`
+        self._state_index.stop_watching()
+
+        self._logger.info(f'{len(self.containers) - len(failed_containers)} of {len(self.containers)} instances '
+                          f'are started in {time.monotonic() - started_at:.1f} seconds.')
+        if failed_containers:
+            self._logger.info(f'Failed instances: {", ".join(failed_containers)}.{ABORTING_EXIT_MESSAGE}')
+            return False
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        try:
+            for container in self.containers:
+                if self._state_index.is_running(container.container_name, refresh=True):
+                    self._client.api.stop(container.container_name)
+        finally:
+            self._state_index.stop_watching()
+
+    def _get_free_names(self, instances_number: int) -> List[str]:
+        base_name = self.base_config['name']
+        taken_names = self._state_index.get_names_with_prefix(f'{base_name}_')
+        names = []
+        index = 0
+        while len(names) < instances_number:
+            name = f'{base_name}_{index}'
+            if name not in taken_names:
+                names.append(name)
+            index += 1
+        return names
+
+    def _create_instance_config(self, instance: dict) -> dict:
+        config = copy.deepcopy(self.base_config)
+        ip_address, _ = config['ports'][INTERNAL_PORT]
+        config['name'] = instance['name']
+        config['ports'][INTERNAL_PORT] = (ip_address, instance['port'])
+        config['environment']['PUBLIC_PORT'] = instance['port']
+        # Every instance is resolved in the network by its own name
+        config['hostname'] = instance['name']
+        config['environment']['NETWORK_ALIAS'] = instance['name']
+        if instance.get('cpuset_cpus'):
+            config['cpuset_cpus'] = instance['cpuset_cpus']
+        if instance.get('cpuset_mems'):
+            config['cpuset_mems'] = instance['cpuset_mems']
+        return config
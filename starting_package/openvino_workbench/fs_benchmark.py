@@ -0,0 +1,179 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Throughput and latency check of the assets directory file system
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from typing import List, Optional
+
+from openvino_workbench.constants import (LOGGER_NAME, FS_BENCHMARK_TIME_BUDGET, FS_BENCHMARK_MAX_FILE_SIZE,
+                                          FS_BENCHMARK_CHUNK_SIZE, FS_BENCHMARK_FSYNC_INTERVAL,
+                                          FS_BENCHMARK_FSYNC_SAMPLES, FS_BENCHMARK_SMALL_FILES_NUMBER,
+                                          FS_BENCHMARK_SMALL_FILE_SIZE, FS_BENCHMARK_THRESHOLDS,
+                                          NETWORK_FILESYSTEM_TYPES)
+
+MOUNTS_PATH = os.path.join('/proc', 'mounts')
+
+
+def detect_filesystem_type(path: str) -> Optional[str]:
+    """Returns the type of the file system the path is on, None if the mounts are not available, e.g. not on Linux"""
+    real_path = os.path.realpath(path)
+    mount_point_length = -1
+    filesystem_type = None
+    try:
+        with open(MOUNTS_PATH, encoding='utf-8') as mounts_file:
+            for line in mounts_file:
+                # Example: server:/export /mnt/assets nfs4 rw,relatime 0 0
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # The spaces and other special characters of the mount points are escaped as octal codes
+                mount_point = re.sub(r'\\([0-7]{3})', lambda match: chr(int(match.group(1), 8)), fields[1])
+                is_parent = real_path == mount_point or real_path.startswith(mount_point.rstrip('/') + '/')
+                # The last of the mounts with the same mount point hides the previous ones
+                if is_parent and len(mount_point) >= mount_point_length:
+                    mount_point_length = len(mount_point)
+                    filesystem_type = fields[2]
+    except OSError:
+        return None
+    return filesystem_type
+
+
+def is_network_filesystem(filesystem_type: Optional[str]) -> bool:
+    return bool(filesystem_type) and filesystem_type.split('.')[-1] in NETWORK_FILESYSTEM_TYPES
+
+
+class FilesystemBenchmark:
+    """
+    Measures the I/O the DL Workbench does in the assets directory: sequential write and read of the models
+    and datasets, fsync of the database and creation of many small files on the dataset extraction.
+    Every measurement takes its share of the time budget and stops early, so slow file systems are measured
+    on less data rather than for longer. The files are created in a temporary directory that is removed afterwards.
+    """
+
+    def __init__(self, directory: str, time_budget: float = FS_BENCHMARK_TIME_BUDGET):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.directory = directory
+        self.time_budget = time_budget
+
+    def run(self) -> dict:
+        results = {'filesystem_type': detect_filesystem_type(self.directory)}
+        benchmark_directory = tempfile.mkdtemp(prefix='.workbench_fs_benchmark_', dir=self.directory)
+        try:
+            data_file_path = os.path.join(benchmark_directory, 'sequential.bin')
+            results['write_throughput'] = self._measure_sequential_write(data_file_path, self.time_budget * 0.4)
+            results['read_throughput'] = self._measure_sequential_read(data_file_path, self.time_budget * 0.2)
+            os.remove(data_file_path)
+            results['fsync_latency'] = self._measure_fsync_latency(os.path.join(benchmark_directory, 'fsync.bin'),
+                                                                   self.time_budget * 0.2)
+            results['small_files_rate'] = self._measure_small_files_rate(benchmark_directory, self.time_budget * 0.2)
+        finally:
+            shutil.rmtree(benchmark_directory, ignore_errors=True)
+        self._logger.debug(f'Assets directory benchmark results: {results}.')
+        return results
+
+    @staticmethod
+    def get_failed_checks(results: dict) -> List[str]:
+        """Returns the descriptions of the measurements that do not meet the DL Workbench needs"""
+        thresholds = FS_BENCHMARK_THRESHOLDS
+        failed_checks = []
+        if results['write_throughput'] < thresholds['write_throughput']:
+            failed_checks.append(f'sequential write is slower than {thresholds["write_throughput"] / 1024 ** 2:.0f} '
+                                 'MB/s')
+        if results['read_throughput'] < thresholds['read_throughput']:
+            failed_checks.append(f'sequential read is slower than {thresholds["read_throughput"] / 1024 ** 2:.0f} '
+                                 'MB/s')
+        if results['fsync_latency'] > thresholds['fsync_latency']:
+            failed_checks.append(f'fsync takes longer than {thresholds["fsync_latency"] * 1000:.0f} ms')
+        if results['small_files_rate'] < thresholds['small_files_rate']:
+            failed_checks.append(f'less than {thresholds["small_files_rate"]} small files are created per second')
+        return failed_checks
+
+    @staticmethod
+    def format_results(results: dict) -> str:
+        return (f'file system: {results["filesystem_type"] or "unknown"}, '
+                f'sequential write: {results["write_throughput"] / 1024 ** 2:.1f} MB/s, '
+                f'sequential read: {results["read_throughput"] / 1024 ** 2:.1f} MB/s, '
+                f'fsync latency: {results["fsync_latency"] * 1000:.1f} ms, '
+                f'small files: {results["small_files_rate"]:.0f} files/s')
+
+    @staticmethod
+    def _measure_sequential_write(path: str, time_budget: float) -> float:
+        """
+        Returns bytes per second. The data is flushed with fsync every few chunks inside the timed loop,
+        otherwise the writes go to the page cache and the final flush on a slow network share exceeds the budget.
+        """
+        chunk = os.urandom(FS_BENCHMARK_CHUNK_SIZE)
+        written_size = 0
+        started_at = time.monotonic()
+        with open(path, 'wb', buffering=0) as data_file:
+            while written_size < FS_BENCHMARK_MAX_FILE_SIZE and time.monotonic() - started_at < time_budget:
+                written_size += data_file.write(chunk)
+                if written_size % FS_BENCHMARK_FSYNC_INTERVAL < FS_BENCHMARK_CHUNK_SIZE:
+                    os.fsync(data_file.fileno())
+            os.fsync(data_file.fileno())
+        return written_size / max(time.monotonic() - started_at, 1e-9)
+
+    @staticmethod
+    def _measure_sequential_read(path: str, time_budget: float) -> float:
+        """Returns bytes per second"""
+        with open(path, 'rb', buffering=0) as data_file:
+            # The file is just written, so it should be read from the storage rather than from the page cache
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(data_file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            read_size = 0
+            started_at = time.monotonic()
+            while time.monotonic() - started_at < time_budget:
+                chunk = data_file.read(FS_BENCHMARK_CHUNK_SIZE)
+                if not chunk:
+                    break
+                read_size += len(chunk)
+        return read_size / max(time.monotonic() - started_at, 1e-9)
+
+    @staticmethod
+    def _measure_fsync_latency(path: str, time_budget: float) -> float:
+        """Returns the median seconds of fsync after a small write, the way the database commits"""
+        latencies = []
+        started_at = time.monotonic()
+        with open(path, 'wb', buffering=0) as data_file:
+            while len(latencies) < FS_BENCHMARK_FSYNC_SAMPLES and (
+                    not latencies or time.monotonic() - started_at < time_budget):
+                data_file.write(b'\0' * FS_BENCHMARK_SMALL_FILE_SIZE)
+                fsync_started_at = time.monotonic()
+                os.fsync(data_file.fileno())
+                latencies.append(time.monotonic() - fsync_started_at)
+        return statistics.median(latencies)
+
+    @staticmethod
+    def _measure_small_files_rate(directory: str, time_budget: float) -> float:
+        """Returns the number of the small files created per second"""
+        content = b'\0' * FS_BENCHMARK_SMALL_FILE_SIZE
+        small_files_directory = os.path.join(directory, 'small_files')
+        os.mkdir(small_files_directory)
+        created_files_number = 0
+        started_at = time.monotonic()
+        while created_files_number < FS_BENCHMARK_SMALL_FILES_NUMBER and time.monotonic() - started_at < time_budget:
+            with open(os.path.join(small_files_directory, f'{created_files_number}.bin'), 'wb') as small_file:
+                small_file.write(content)
+            created_files_number += 1
+        return created_files_number / max(time.monotonic() - started_at, 1e-9)
@@ -0,0 +1,125 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ CPU, NUMA and memory resources of the host
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import glob
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+SYSFS_NODE_DIRECTORY = os.path.join('/sys', 'devices', 'system', 'node')
+MEMINFO_PATH = os.path.join('/proc', 'meminfo')
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """Parses the Linux CPU list format, e.g. `0-3,8-11` -> [0, 1, 2, 3, 8, 9, 10, 11]"""
+    cpus = set()
+    for cpu_range in cpu_list.strip().split(','):
+        if not cpu_range:
+            continue
+        first_cpu, _, last_cpu = cpu_range.partition('-')
+        cpus.update(range(int(first_cpu), int(last_cpu or first_cpu) + 1))
+    return sorted(cpus)
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    """Formats the CPUs in the Linux CPU list format, e.g. [0, 1, 2, 3, 8] -> `0-3,8`"""
+    cpu_ranges = []
+    for cpu in sorted(cpus):
+        if cpu_ranges and cpu == cpu_ranges[-1][1] + 1:
+            cpu_ranges[-1][1] = cpu
+        else:
+            cpu_ranges.append([cpu, cpu])
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in cpu_ranges)
+
+
+def read_numa_topology() -> Dict[int, dict]:
+    """
+    Returns the CPUs and the free memory in bytes of every NUMA node that has CPUs.
+    The hosts without the NUMA information in sysfs are reported as a single node with all the available CPUs.
+    """
+    topology = {}
+    for node_directory in glob.glob(os.path.join(SYSFS_NODE_DIRECTORY, 'node[0-9]*')):
+        node_id = int(os.path.basename(node_directory)[len('node'):])
+        try:
+            with open(os.path.join(node_directory, 'cpulist'), encoding='utf-8') as cpu_list_file:
+                cpus = parse_cpu_list(cpu_list_file.read())
+            with open(os.path.join(node_directory, 'meminfo'), encoding='utf-8') as meminfo_file:
+                # Example: Node 0 MemFree:   123456 kB
+                free_memory_match = re.search(r'MemFree:\s+(\d+)\s+kB', meminfo_file.read())
+        except (OSError, ValueError):
+            continue
+        # Memory-only nodes cannot run the container
+        if cpus:
+            topology[node_id] = {'cpus': cpus,
+                                 'free_memory': int(free_memory_match.group(1)) * 1024 if free_memory_match else None}
+    if not topology:
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count()))
+        topology[0] = {'cpus': cpus, 'free_memory': None}
+    return topology
+
+
+def select_numa_node(topology: Dict[int, dict]) -> int:
+    """Returns the node with the most free memory, the node with more CPUs is preferred on a tie"""
+    return max(topology, key=lambda node_id: (topology[node_id]['free_memory'] or 0, len(topology[node_id]['cpus'])))
+
+
+def split_cpu_sets(topology: Dict[int, dict], instances_number: int, node_ids: Optional[List[int]] = None,
+                   cpus: Optional[List[int]] = None) -> List[Tuple[str, Optional[str]]]:
+    """
+    Returns non-overlapping CPU sets and the memory nodes of the instances. The instances are distributed
+    over the NUMA nodes in turn and the CPUs of every node are split between its instances evenly.
+    If the CPUs are provided, they are split without binding the memory.
+    Returns an empty list if there are more instances than CPUs.
+    """
+    if cpus is not None:
+        groups = [(cpus, None)]
+    else:
+        groups = [(topology[node_id]['cpus'], str(node_id)) for node_id in (node_ids or sorted(topology))]
+    instances_per_group = [instances_number // len(groups) + (index < instances_number % len(groups))
+                           for index in range(len(groups))]
+
+    cpu_sets = []
+    for (group_cpus, memory_nodes), group_instances_number in zip(groups, instances_per_group):
+        if not group_instances_number:
+            continue
+        cpus_per_instance = len(group_cpus) // group_instances_number
+        if not cpus_per_instance:
+            return []
+        for index in range(group_instances_number):
+            instance_cpus = group_cpus[index * cpus_per_instance:(index + 1) * cpus_per_instance]
+            cpu_sets.append((format_cpu_list(instance_cpus), memory_nodes))
+    return cpu_sets
+
+
+def read_meminfo() -> Dict[str, int]:
+    """
+    Returns the memory statistics of the host, the sizes are converted to bytes and the page counters are kept as is.
+    Returns an empty dictionary if the statistics are not available, e.g. not on Linux.
+    """
+    meminfo = {}
+    try:
+        with open(MEMINFO_PATH, encoding='utf-8') as meminfo_file:
+            for line in meminfo_file:
+                # Example: MemTotal:       16318412 kB
+                match = re.match(r'(\S+):\s+(\d+)(\s+kB)?', line)
+                if match:
+                    meminfo[match.group(1)] = int(match.group(2)) * (1024 if match.group(3) else 1)
+    except OSError:
+        return {}
+    return meminfo
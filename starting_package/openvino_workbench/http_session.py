@@ -0,0 +1,85 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Pooled HTTP session for the requests to the remote hosts
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from openvino_workbench.constants import (HTTP_CONNECT_TIMEOUT, REGISTRY_REQUEST_TIMEOUT, HTTP_CONNECTION_POOL_SIZE,
+                                          HTTP_MAX_RETRIES, HTTP_RETRY_BACKOFF_FACTOR)
+from openvino_workbench.utils import get_proxy_from_env
+from requests.adapters import HTTPAdapter
+from requests.utils import should_bypass_proxies
+from urllib3.util.retry import Retry
+
+
+class StarterHTTPAdapter(HTTPAdapter):
+    """
+    Sets the default timeout and bypasses the proxies for the `no_proxy` hosts on every sent request,
+    including the redirects, as requests does not apply `no_proxy` to the explicitly provided proxies.
+    """
+
+    def __init__(self, timeout: Union[float, Tuple[float, float]], no_proxy: Optional[str], **kwargs):
+        self.timeout = timeout
+        self.no_proxy = no_proxy
+        super().__init__(**kwargs)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        # The session passes None if the timeout is not provided for the request
+        if timeout is None:
+            timeout = self.timeout
+        if self.no_proxy and should_bypass_proxies(request.url, no_proxy=self.no_proxy):
+            proxies = {}
+        return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+
+class StarterHTTPSession(requests.Session):
+    """
+    Keeps the connections to the remote hosts alive, so the registry, the token service and the mirrors
+    are connected once through the proxy. Every request has a timeout unless another one is provided.
+    """
+
+    def __init__(self, proxies: Optional[dict] = None,
+                 timeout: Union[float, Tuple[float, float]] = (HTTP_CONNECT_TIMEOUT, REGISTRY_REQUEST_TIMEOUT),
+                 pool_size: int = HTTP_CONNECTION_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES):
+        super().__init__()
+        proxies = proxies or {}
+        # Proxies are provided with the arguments that default to the environment variables
+        no_proxy = proxies.get('no_proxy') or get_proxy_from_env('no_proxy')
+        self.proxies.update({scheme: proxy for scheme, proxy in proxies.items() if scheme != 'no_proxy' and proxy})
+
+        retry = Retry(total=max_retries, backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+                      status_forcelist=(429, 502, 503, 504), raise_on_status=False)
+        adapter = StarterHTTPAdapter(timeout=timeout, no_proxy=no_proxy, pool_connections=pool_size,
+                                     pool_maxsize=pool_size, max_retries=retry)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+
+_SESSIONS: Dict[tuple, StarterHTTPSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_http_session(proxies: Optional[dict] = None) -> StarterHTTPSession:
+    """Returns the session shared by all the components that use the same proxies"""
+    key = tuple(sorted((proxies or {}).items()))
+    with _SESSIONS_LOCK:
+        if key not in _SESSIONS:
+            _SESSIONS[key] = StarterHTTPSession(proxies=proxies)
+        return _SESSIONS[key]
@@ -18,39 +18,175 @@
 """
 
 import logging
+import queue
 import sys
-from typing import Tuple
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
 
-import requests
 from docker import DockerClient
-from openvino_workbench.constants import DOCKER_HUB_TAGS_URL, EXAMPLE_COMMAND, ABORTING_EXIT_MESSAGE, LOGGER_NAME
-from tqdm import tqdm
+from docker.errors import DockerException
+from docker.types import CancellableStream
+from docker.utils import parse_repository_tag
+from openvino_workbench.constants import EXAMPLE_COMMAND, ABORTING_EXIT_MESSAGE, LOGGER_NAME, PULL_STALL_TIMEOUT
+from openvino_workbench.image_index import LocalImageIndex
+from openvino_workbench.metadata_cache import RegistryMetadataCache
+from openvino_workbench.mirrors import RegistryMirrorSelector
+from openvino_workbench.pull_progress import PullProgressTracker
+from openvino_workbench.pull_report import PullTelemetryRecorder
+from openvino_workbench.registry import RegistryClient
+
+
+class PullEventStream:
+    """
+    Reads the pull progress from the Docker daemon in a separate thread, so the pull that reports no progress
+    for the stall timeout can be abandoned. After the iteration `error` describes why the pull was not complete.
+    The connection of the abandoned pull is closed, so the daemon cancels the transfer. Otherwise the next pull
+    of the same layers would wait for the stalled transfer as the daemon shares the layer downloads.
+    """
+
+    # Marks the end of the progress stream
+    _STREAM_END = None
+
+    def __init__(self, docker_client: DockerClient, repository: str, tag: str,
+                 stall_timeout: int = PULL_STALL_TIMEOUT):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.repository = repository
+        self.tag = tag
+        self.stall_timeout = stall_timeout
+        self.error: Optional[str] = None
+        self._events = queue.Queue()
+        self._is_abandoned = threading.Event()
+        self._response = None
+        self._response_lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[dict]:
+        reader = threading.Thread(target=self._read_pull_stream, daemon=True)
+        reader.start()
+        try:
+            while True:
+                try:
+                    line = self._events.get(timeout=self.stall_timeout)
+                except queue.Empty:
+                    self.error = f'no progress for {self.stall_timeout} seconds'
+                    return
+                if line is self._STREAM_END:
+                    return
+                if 'error' in line:
+                    self.error = line['error']
+                    return
+                yield line
+        finally:
+            with self._response_lock:
+                self._is_abandoned.set()
+                self._close_response()
+
+    def _read_pull_stream(self):
+        def capture_pull_response(response, **kwargs):  # pylint: disable=unused-argument
+            if '/images/create' in response.request.path_url:
+                with self._response_lock:
+                    self._response = response
+                    # The pull is abandoned before the daemon responded
+                    if self._is_abandoned.is_set():
+                        self._close_response()
+
+        # The pull API returns the decoded lines only, the response is taken from the client hooks
+        response_hooks = self._client.api.hooks['response']
+        try:
+            response_hooks.append(capture_pull_response)
+            try:
+                pull_stream = self._client.api.pull(repository=self.repository, tag=self.tag, stream=True,
+                                                    decode=True)
+            finally:
+                response_hooks.remove(capture_pull_response)
+            for line in pull_stream:
+                if self._is_abandoned.is_set():
+                    return
+                self._events.put(line)
+        except Exception as error:
+            if self._is_abandoned.is_set():
+                return
+            self._logger.debug(f'Could not pull the image from the repository: {self.repository}.', exc_info=True)
+            self._events.put({'error': str(error)})
+        self._events.put(self._STREAM_END)
+
+    def _close_response(self):
+        if self._response is None:
+            return
+        try:
+            # Shuts the socket down, so the reader thread blocked on it is released as well
+            CancellableStream(stream=None, response=self._response).close()
+        except (DockerException, OSError):
+            self._logger.debug('Could not close the pull connection.', exc_info=True)
+        self._response = None
 
 
 class DockerImage:
-    def __init__(self, docker_client: DockerClient, image_name: str, proxies=None):
+    def __init__(self, docker_client: DockerClient, image_name: str, proxies=None,
+                 metadata_cache: Optional[RegistryMetadataCache] = None,
+                 image_index: Optional[LocalImageIndex] = None,
+                 registry_mirrors: Optional[List[str]] = None):
         if proxies is None:
             proxies = {}
         self.client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
         self.image_name = image_name
         self.repository, self.tag = self._parse_image_name(self.image_name)
-        self._logger = logging.getLogger(LOGGER_NAME)
         self.proxies = proxies
-        self._is_present = self._is_image_present()
-        self._is_present_in_registry = self._is_image_present_in_registry()
-
-    def pull(self, force_pull: bool = False):
+        self._metadata_cache = metadata_cache or RegistryMetadataCache(ttl=0)
+        self._is_present = self._is_image_present(image_index or LocalImageIndex(docker_client))
+        self._mirror_selector = RegistryMirrorSelector(mirrors=registry_mirrors or [], proxies=proxies)
+        # Remote metadata is requested only when it is needed, e.g. the image is pulled.
+        # Keys: 'mirror_sources', 'is_present_in_registry', 'layer_sizes'
+        self._registry_metadata = {}
+
+    @property
+    def mirror_sources(self) -> List[str]:
+        """Mirror repositories that have the requested image, from the fastest one"""
+        if 'mirror_sources' not in self._registry_metadata:
+            mirror_sources = []
+            # A digest-pinned image pulled from a mirror cannot be tagged with its original name
+            if self._mirror_selector.mirrors and not self._is_digest_reference:
+                mirror_sources = self._mirror_selector.get_pull_sources(self.repository, self.tag)
+                self._logger.debug(f'Registry mirrors that have the image: {mirror_sources}')
+            self._registry_metadata['mirror_sources'] = mirror_sources
+        return self._registry_metadata['mirror_sources']
+
+    @property
+    def is_present_in_registry(self) -> bool:
+        if 'is_present_in_registry' not in self._registry_metadata:
+            cached_metadata = self._metadata_cache.get(self.image_name) or {}
+            self._registry_metadata['is_present_in_registry'] = (bool(self.mirror_sources)
+                                                                 or bool(cached_metadata.get('digest'))
+                                                                 or self._is_image_present_in_registry())
+        return self._registry_metadata['is_present_in_registry']
+
+    @property
+    def layer_sizes(self) -> Dict[str, int]:
+        """Compressed sizes of the layers of the requested tag keyed by the short layer ID used in the pull progress"""
+        if 'layer_sizes' not in self._registry_metadata:
+            cached_metadata = self._metadata_cache.get(self.image_name) or {}
+            layer_sizes = cached_metadata.get('layer_sizes')
+            if not layer_sizes:
+                layer_sizes = self._get_layer_sizes()
+                if layer_sizes:
+                    self._metadata_cache.put(self.image_name, layer_sizes=layer_sizes)
+            self._registry_metadata['layer_sizes'] = layer_sizes
+        return self._registry_metadata['layer_sizes']
+
+    def pull(self, force_pull: bool = False, show_layer_progress: bool = False,
+             pull_report_path: Optional[str] = None, stall_timeout: int = PULL_STALL_TIMEOUT):
         self._logger.debug(f'Pulling image with the name: {self.image_name}')
 
         if self._is_present and not force_pull:
             self._logger.debug('Image is present on the machine.')
             self._logger.info(
-                f'The specified image: {self.repository}:{self.tag} is present on the machine. Continuing with it...\n'
+                f'The specified image: {self.image_name} is present on the machine. Continuing with it...\n'
                 'NOTE: If you want to force-update your image, add `--force-pull` argument.\n')
             return
 
         # Check if image is present in registry
-        if not self._is_present_in_registry:
+        if not self.is_present_in_registry:
             self._logger.info(f'ERROR: The specified image name: "{self.image_name}" might be incorrect.'
                               f'\nCould not find the image in the {self.repository} repository.'
                               f'\nCheck if the image name is correct and has the following format: '
@@ -60,69 +196,70 @@ class DockerImage:
             sys.exit(1)
 
         # Get image size
-        total_image_size = self._get_image_size(DOCKER_HUB_TAGS_URL)
-        if not total_image_size:
-            self._logger.info('WARNING: Could not get the image size from Docker Hub, '
-                              'pulling without displaying progress.')
-            self._pull_image_without_progress()
-            return
-
-        # To keep track of current downloading/extraction
-        # Structure example:
-        # layers = {'id1': {'downloading': 1000, 'extracting': 2000},
-        #           'id2': {'downloading': 500000, 'extracting': 1000000}}
-        layers_info = {}
-
-        bar_formatting = '{desc}: |{bar}|{percentage:3.0f}%. Elapsed Time: {elapsed}. Remaining (Estimated): {' \
-                         'remaining}. '
-
-        with tqdm(desc='Pulling Image', bar_format=bar_formatting, total=100, ncols=90, ascii=True) \
-                as progress_bar:
-
-            for line in self.client.api.pull(repository=self.repository, tag=self.tag, stream=True, decode=True):
-                result = self._extract_progress_info(line)
-                layer_id = result['id']
-
-                if layer_id and layer_id not in layers_info:
-                    layers_info[layer_id] = {'downloading': 0, 'extracting': 0}
+        layer_sizes = self.layer_sizes
 
-                # Get current progress of layer pulling
-                if result['status'] == 'Extracting':
-                    layers_info[layer_id]['extracting'] = result['current']
-                elif result['status'] == 'Downloading':
-                    layers_info[layer_id]['downloading'] = result['current']
+        telemetry = None
+        if pull_report_path:
+            telemetry = PullTelemetryRecorder(image_name=self.image_name, layer_sizes=layer_sizes)
 
-                # Calculate current progress
-                total_downloaded = 0
-                total_extracted = 0
-                for statuses in layers_info.values():
-                    total_downloaded += statuses['downloading']
-                    total_extracted += statuses['extracting']
-
-                progress_total = self._calculate_total_progress(total_downloaded, total_extracted, total_image_size)
-
-                # Update progress bar
-                if progress_total != progress_bar.last_print_n < 100:
-                    self._update_progress_bar(progress_total, progress_bar)
-
-            # Last update if < 100
-            self._update_progress_bar(progress_bar.total, progress_bar)
+        if not layer_sizes:
+            self._logger.info('WARNING: Could not get the image size from the registry, '
+                              'pulling without displaying progress.')
 
+        # Fall back to the next mirror and finally to the original registry if the pull fails or stalls
+        pull_sources = self.mirror_sources + [self.repository]
+        for source_index, source_repository in enumerate(pull_sources):
+            if telemetry:
+                telemetry.source = source_repository
+            if self._pull_from_source(source_repository, layer_sizes, show_layer_progress, stall_timeout, telemetry):
+                break
+            if source_index == len(pull_sources) - 1:
+                self._logger.info(f'ERROR: Could not pull the image: {self.image_name}.'
+                                  f'{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+            self._logger.info(f'WARNING: Could not pull the image from {source_repository}, '
+                              f'pulling from {pull_sources[source_index + 1]}...')
+
+        if source_repository != self.repository:
+            # Containers are created from the original image name regardless of the mirror
+            self.client.api.tag(f'{source_repository}:{self.tag}', self.repository, self.tag)
+            self._logger.debug(f'Image pulled from {source_repository} is tagged as {self.image_name}.')
+
+        if telemetry:
+            telemetry.save(pull_report_path)
+
+    def _pull_from_source(self, source_repository: str, layer_sizes: Dict[str, int], show_layer_progress: bool,
+                          stall_timeout: int, telemetry: Optional[PullTelemetryRecorder] = None) -> bool:
+        self._logger.debug(f'Pulling the image: {self.image_name} from the repository: {source_repository}')
+        pull_events = PullEventStream(docker_client=self.client, repository=source_repository, tag=self.tag,
+                                      stall_timeout=stall_timeout)
+        if not layer_sizes:
+            self._logger.info('Pulling the image...')
+            for line in pull_events:
+                if telemetry:
+                    telemetry.record(self._extract_progress_info(line))
+        else:
+            with PullProgressTracker(layer_sizes=layer_sizes, show_layers=show_layer_progress) as progress_tracker:
+                for line in pull_events:
+                    progress_info = self._extract_progress_info(line)
+                    progress_tracker.update(progress_info)
+                    if telemetry:
+                        telemetry.record(progress_info)
+                if pull_events.error:
+                    progress_tracker.interrupt()
+
+        if pull_events.error:
+            self._logger.debug(f'Pulling from {source_repository} failed: {pull_events.error}')
+            return False
         self._logger.debug('Image was pulled.')
         self._logger.info('\nPull is complete.')
-
-    def _pull_image_without_progress(self):
-        self._logger.debug(f'Pulling the image: {self.image_name} without progress bar.')
-        self._logger.info('Pulling the image...')
-        self.client.api.pull(repository=self.repository, tag=self.tag)
-        self._logger.info('Pull is complete.')
-        self._logger.debug('Image was pulled without progress.')
+        return True
 
     def _parse_image_name(self, image_name: str) -> Tuple[str, str]:
-        try:
-            repository, tag = image_name.split(':')
-        except ValueError:
-            self._logger.error('Could not parse the image name.', exc_info=True)
+        # The tag is either a tag name or a digest for the digest-pinned images (repository@sha256:...)
+        repository, tag = parse_repository_tag(image_name)
+        if not tag:
+            self._logger.error(f'Could not parse the image name: {image_name}.')
             self._logger.info(f'ERROR: The specified image name: "{image_name}" might be incorrect.'
                               '\nSpecify the image name in the following format: repository:tag.'
                               f'{EXAMPLE_COMMAND}'
@@ -130,34 +267,43 @@ class DockerImage:
             sys.exit(1)
         return repository, tag
 
-    def _is_image_present(self) -> bool:
-        if not self.client.images.list(name=self.repository):
-            return False
+    @property
+    def _is_digest_reference(self) -> bool:
+        return self.tag.startswith('sha256:') and '@' in self.image_name
 
-        for image in self.client.images.list(name=self.repository):
-            if not image.attrs['RepoTags']:
-                continue
-            repository, tag = self._parse_image_name(image.attrs['RepoTags'][0])
-            if repository == self.repository and tag == self.tag:
-                return True
-        return False
+    def _is_image_present(self, image_index: LocalImageIndex) -> bool:
+        return image_index.has(self.image_name)
 
     def _is_image_present_in_registry(self) -> bool:
         try:
             # If the image exists, this will not raise an error and return non-empty object
-            return bool(self.client.images.get_registry_data(self.image_name))
+            registry_data = self.client.images.get_registry_data(self.image_name)
+            if registry_data:
+                self._metadata_cache.put(self.image_name, digest=registry_data.id)
+            return bool(registry_data)
         # Raises error otherwise
         except Exception:
             self._logger.error(f'Image with the name "{self.image_name}" was not found in registry.', exc_info=True)
             return False
 
-    def _get_image_size(self, repository_tags_url: str) -> int:
+    def _get_layer_sizes(self) -> Dict[str, int]:
         try:
-            images_info = requests.get(repository_tags_url, proxies=self.proxies).json()
-            return images_info['results'][0]['full_size']
+            # Mirrors serve the same manifests as the original registry
+            if self.mirror_sources:
+                registry_client, repository = self._mirror_selector.registry_client, self.mirror_sources[0]
+            else:
+                registry_client, repository = RegistryClient(proxies=self.proxies), self.repository
+            layer_sizes = registry_client.get_layer_sizes(repository, self.tag)
         except Exception:
-            self._logger.error(f'Could not get the image size from the Hub. Image {self.image_name}', exc_info=True)
-            return 0
+            self._logger.error(f'Could not get the image size from the registry. Image {self.image_name}',
+                               exc_info=True)
+            return {}
+        # Pull progress reports layers by the first 12 characters of the digest
+        return {self._get_short_layer_id(digest): size for digest, size in layer_sizes.items()}
+
+    @staticmethod
+    def _get_short_layer_id(layer_digest: str) -> str:
+        return layer_digest.split(':')[-1][:12]
 
     @staticmethod
     def _extract_progress_info(pull_progress: dict) -> dict:
@@ -179,11 +325,3 @@ class DockerImage:
                     'current': current}
 
         return progress
-
-    @staticmethod
-    def _calculate_total_progress(total_downloaded: int, total_extracted: int, total_image_size: int) -> int:
-        return int(0.5 * (total_downloaded + total_extracted) / total_image_size * 100)
-
-    @staticmethod
-    def _update_progress_bar(progress: int, progress_bar: tqdm):
-        progress_bar.update(progress - progress_bar.n)
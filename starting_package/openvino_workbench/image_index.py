@@ -0,0 +1,88 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Index of the Docker images present on the machine
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from docker import DockerClient
+from docker.utils import parse_repository_tag
+from openvino_workbench.constants import LOGGER_NAME
+from openvino_workbench.registry import split_registry_from_repository
+
+
+def get_image_reference_key(image_name: str) -> str:
+    """
+    Returns the canonical reference of the image, so `ubuntu:20.04` and `docker.io/library/ubuntu:20.04`
+    are the same key. Digest-pinned names (`repository@sha256:...`) keep the digest.
+    """
+    repository, reference = parse_repository_tag(image_name)
+    registry, path = split_registry_from_repository(repository)
+    if reference and reference.startswith('sha256:') and '@' in image_name:
+        return f'{registry}/{path}@{reference}'
+    return f'{registry}/{path}:{reference or "latest"}'
+
+
+class LocalImageIndex:
+    """
+    Maps every tag and every repository digest of the local images to the image ID.
+    The index is built from a single listing call and can be shared by the components of the starter.
+    """
+
+    def __init__(self, docker_client: DockerClient):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self._image_ids: Dict[str, str] = {}
+        # Layer diff IDs of the images, requested only when needed as every image is inspected separately
+        self._image_layers: Dict[str, List[str]] = {}
+        self.refresh()
+
+    def refresh(self):
+        image_ids = {}
+        for image in self._client.images.list():
+            image_ids[image.id] = image.id
+            for image_name in (image.attrs.get('RepoTags') or []) + (image.attrs.get('RepoDigests') or []):
+                # Dangling images are reported with the `<none>` placeholders
+                if '<none>' in image_name:
+                    continue
+                image_ids[get_image_reference_key(image_name)] = image.id
+        self._image_ids = image_ids
+        self._image_layers = {}
+        self._logger.debug(f'Local image index contains {len(self._image_ids)} references.')
+
+    def get_image_id(self, image_name: str) -> Optional[str]:
+        if image_name in self._image_ids:
+            return self._image_ids[image_name]
+        return self._image_ids.get(get_image_reference_key(image_name))
+
+    def has(self, image_name: str) -> bool:
+        return self.get_image_id(image_name) is not None
+
+    def get_longest_present_layer_chain(self, layer_diff_ids: List[str]) -> int:
+        """Returns the number of the first layers of the provided chain that any local image already has"""
+        longest_chain = 0
+        for image_id in set(self._image_ids.values()):
+            if image_id not in self._image_layers:
+                self._image_layers[image_id] = self._client.api.inspect_image(image_id)['RootFS'].get('Layers', [])
+            common_chain = 0
+            for local_diff_id, diff_id in zip(self._image_layers[image_id], layer_diff_ids):
+                if local_diff_id != diff_id:
+                    break
+                common_chain += 1
+            longest_chain = max(longest_chain, common_chain)
+        return longest_chain
@@ -0,0 +1,128 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Streaming of the attached DL Workbench container logs
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import codecs
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Iterable, Optional, TextIO
+
+from openvino_workbench.constants import (LOGGER_NAME, LOG_PUMP_FLUSH_INTERVAL, LOG_PUMP_BUFFER_SIZE,
+                                          CONTAINER_LOG_FILE_BACKUPS)
+
+
+class RotatingLogFile:
+    """
+    Appends raw bytes to the file and rotates it when the size limit is reached:
+    the current file becomes `path.1`, the previous `path.1` becomes `path.2` and so on.
+    """
+
+    def __init__(self, path: str, max_size: int, backups: int = CONTAINER_LOG_FILE_BACKUPS):
+        self.path = path
+        self.max_size = max_size
+        self.backups = backups
+        self._file = open(self.path, 'ab')  # pylint: disable=consider-using-with
+        self._size = self._file.tell()
+
+    def write(self, data: bytes):
+        if self._size + len(data) > self.max_size and self._size:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            previous_backup = f'{self.path}.{index}'
+            if os.path.exists(previous_backup):
+                os.replace(previous_backup, f'{self.path}.{index + 1}')
+        if self.backups:
+            os.replace(self.path, f'{self.path}.1')
+        self._file = open(self.path, 'wb')  # pylint: disable=consider-using-with
+        self._size = 0
+
+
+class ContainerLogPump:
+    """
+    Copies the container output to the terminal in batches and, optionally, to a rotated log file.
+    Multi-byte characters split between chunks are decoded correctly, the terminal is written
+    when the buffer is full or when the flush interval passes, whichever comes first.
+    """
+
+    def __init__(self, output: TextIO = sys.stdout, log_file: Optional[RotatingLogFile] = None,
+                 flush_interval: float = LOG_PUMP_FLUSH_INTERVAL, buffer_size: int = LOG_PUMP_BUFFER_SIZE):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self._output = output
+        self._log_file = log_file
+        self._flush_interval = flush_interval
+        self._buffer_size = buffer_size
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending_text = []
+        self._pending_size = 0
+        self._lock = threading.Lock()
+        self._is_pumping = threading.Event()
+
+    def pump(self, chunks: Iterable[bytes]):
+        self._is_pumping.set()
+        flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        flusher.start()
+        try:
+            for chunk in chunks:
+                text = self._decoder.decode(chunk)
+                with self._lock:
+                    if self._log_file:
+                        self._log_file.write(chunk)
+                    self._pending_text.append(text)
+                    self._pending_size += len(chunk)
+                    if self._pending_size >= self._buffer_size:
+                        self._flush()
+        finally:
+            self._is_pumping.clear()
+            with self._lock:
+                self._pending_text.append(self._decoder.decode(b'', final=True))
+                self._flush()
+                if self._log_file:
+                    self._log_file.close()
+            self._logger.debug('Stopped streaming the container logs.')
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self._flush_interval)
+            with self._lock:
+                if not self._is_pumping.is_set():
+                    return
+                self._flush()
+
+    def _flush(self):
+        if not self._pending_text:
+            return
+        self._output.write(''.join(self._pending_text))
+        self._pending_text.clear()
+        self._pending_size = 0
+        self._output.flush()
+        if self._log_file:
+            self._log_file.flush()
@@ -16,15 +16,250 @@
  See the License for the specific language governing permissions and
  limitations under the License.
 """
+import subprocess  # nosec
 import sys
+from argparse import Namespace
+from typing import List, Optional
 
 from docker import DockerClient
 from openvino_workbench.arguments_parser import StarterArgumentsParser
-from openvino_workbench.constants import LOGGER, LOG_FILE, ABORTING_EXIT_MESSAGE
+from openvino_workbench.baking import ImageBaker
+from openvino_workbench.bundle import ImageBundle
+from openvino_workbench.constants import (LOGGER, LOG_FILE, ABORTING_EXIT_MESSAGE, AUTO_PORT, DEFAULT_PUBLIC_PORT,
+                                          STANDBY_REPLENISHER_SKIPPED_FLAGS, STANDBY_REPLENISHER_SKIPPED_OPTIONS)
 from openvino_workbench.container import DockerContainer
+from openvino_workbench.container_state import ContainerStateIndex
 from openvino_workbench.docker_config_creator import DockerConfigCreator
+from openvino_workbench.fleet import WorkbenchFleet, read_fleet_manifest
 from openvino_workbench.image import DockerImage
+from openvino_workbench.image_index import LocalImageIndex
+from openvino_workbench.metadata_cache import RegistryMetadataCache
+from openvino_workbench.port_allocator import HostPortAllocator
+from openvino_workbench.preflight import PreflightPipeline
+from openvino_workbench.standby_pool import StandbyPool
 from openvino_workbench.utils import print_starting_message, initialize_docker_client, save_logs_on_failure
+from openvino_workbench.volumes import PersistentVolume
+
+
+def create_config(arguments: Namespace, port_allocator: Optional[HostPortAllocator] = None) -> dict:
+    if port_allocator:
+        arguments.port = port_allocator.allocate(preferred_port=DEFAULT_PUBLIC_PORT)
+        if arguments.port is None:
+            LOGGER.info(f'ERROR: There are no free ports on the machine.{ABORTING_EXIT_MESSAGE}')
+            sys.exit(1)
+    return DockerConfigCreator(arguments=arguments).config
+
+
+def get_proxies(arguments: Namespace) -> dict:
+    proxies = {}
+    if arguments.http_proxy:
+        proxies['http'] = arguments.http_proxy
+    if arguments.https_proxy:
+        proxies['https'] = arguments.https_proxy
+    if arguments.no_proxy:
+        proxies['no_proxy'] = arguments.no_proxy
+    return proxies
+
+
+def export_bundle(arguments: Namespace, proxies: dict, metadata_cache: RegistryMetadataCache):
+    """Pulls the image, exports it to an offline bundle and exits"""
+    docker_client: DockerClient = initialize_docker_client()
+    try:
+        image = DockerImage(docker_client=docker_client, image_name=arguments.image, proxies=proxies,
+                            metadata_cache=metadata_cache, registry_mirrors=arguments.registry_mirrors)
+        image.pull(arguments.force_pull, show_layer_progress=arguments.show_layer_progress,
+                   pull_report_path=arguments.pull_report, stall_timeout=arguments.pull_stall_timeout)
+        ImageBundle(docker_client=docker_client, path=arguments.export_bundle).export(
+            image_name=arguments.image, compression=arguments.bundle_compression)
+    except KeyboardInterrupt:
+        LOGGER.debug('Bundle export was interrupted.')
+        LOGGER.info(f'Bundle export was interrupted. \n{ABORTING_EXIT_MESSAGE}')
+        sys.exit(1)
+    sys.exit(0)
+
+
+def import_bundle(arguments: Namespace) -> str:
+    """Imports the image from an offline bundle, returns the reference of the imported image"""
+    docker_client: DockerClient = initialize_docker_client()
+    try:
+        return ImageBundle(docker_client=docker_client, path=arguments.import_bundle).import_()
+    except KeyboardInterrupt:
+        LOGGER.debug('Bundle import was interrupted.')
+        LOGGER.info(f'Bundle import was interrupted. \n{ABORTING_EXIT_MESSAGE}')
+        sys.exit(1)
+
+
+def run_preflight(arguments: Namespace, proxies: dict, metadata_cache: RegistryMetadataCache,
+                  is_fleet: bool) -> dict:
+    """
+    Initializes Docker client, creates config for Docker container and inspects the image and the container
+    concurrently, as most of these steps are independent calls to the Docker daemon, the registry or the host
+    """
+    preflight = PreflightPipeline()
+    preflight.add_task('docker_client', initialize_docker_client)
+    if arguments.port == AUTO_PORT or is_fleet or arguments.pool_size:
+        preflight.add_task('port_allocator',
+                           lambda docker_client: HostPortAllocator(docker_client, ip_address=arguments.ip),
+                           dependencies=('docker_client',))
+    else:
+        preflight.add_task('port_allocator', lambda: None)
+    if arguments.port == AUTO_PORT and not is_fleet:
+        # The port has to be allocated before the config is created as it is passed to the container environment
+        preflight.add_task('config', lambda port_allocator: create_config(arguments, port_allocator),
+                           dependencies=('port_allocator',))
+    else:
+        preflight.add_task('config', lambda: create_config(arguments))
+    preflight.add_task('image_index', LocalImageIndex, dependencies=('docker_client',))
+    preflight.add_task('image',
+                       lambda docker_client, image_index: DockerImage(docker_client=docker_client,
+                                                                      image_name=arguments.image, proxies=proxies,
+                                                                      metadata_cache=metadata_cache,
+                                                                      image_index=image_index,
+                                                                      registry_mirrors=arguments.registry_mirrors),
+                       dependencies=('docker_client', 'image_index'))
+    preflight.add_task('container_state', ContainerStateIndex, dependencies=('docker_client',))
+    preflight.add_task('container',
+                       lambda docker_client, config, port_allocator, container_state: DockerContainer(
+                           docker_client=docker_client, config=config,
+                           container_log_file=arguments.container_log_file,
+                           container_log_file_max_size_mb=arguments.container_log_file_max_size,
+                           port_allocator=port_allocator, state_index=container_state),
+                       dependencies=('docker_client', 'config', 'port_allocator', 'container_state'))
+    try:
+        return preflight.run()
+    except KeyboardInterrupt:
+        LOGGER.debug('Preflight was interrupted.')
+        LOGGER.info(f'Starting was interrupted. \n{ABORTING_EXIT_MESSAGE}')
+        sys.exit(1)
+
+
+def bake_image(arguments: Namespace, preflight_results: dict, config: dict):
+    """Commits the initialized container to a derived image and exits, removes the container if interrupted"""
+    image_baker = ImageBaker(docker_client=preflight_results['docker_client'], config=config,
+                             state_index=preflight_results['container_state'])
+    try:
+        image_baker.bake(network_name=arguments.network_name)
+    except KeyboardInterrupt:
+        LOGGER.debug('Baking was interrupted.')
+        LOGGER.info(f'Baking was interrupted. \n{ABORTING_EXIT_MESSAGE}')
+        image_baker.remove_bake_container()
+        sys.exit(1)
+    sys.exit(0)
+
+
+def use_baked_image(preflight_results: dict, config: dict):
+    baked_image = ImageBaker(docker_client=preflight_results['docker_client'], config=config,
+                             state_index=preflight_results['container_state']).find_baked_image()
+    if not baked_image:
+        return
+    baked_image_id, startup_baseline = baked_image
+    LOGGER.info(f'Starting from the pre-initialized image: {baked_image_id}\n'
+                'NOTE: If you want to start from the specified image, add `--no-baked-image` argument.\n')
+    config['image'] = baked_image_id
+    preflight_results['container'].startup_baseline = startup_baseline
+
+
+def start_fleet(arguments: Namespace, preflight_results: dict, config: dict,
+                fleet_manifest_instances: Optional[List[dict]]):
+    """Starts the instances of the fleet in the detached mode and exits, stops the started ones on CMD/Ctrl+C"""
+    fleet = WorkbenchFleet(docker_client=preflight_results['docker_client'], base_config=config,
+                           port_allocator=preflight_results['port_allocator'],
+                           state_index=preflight_results['container_state'], max_workers=arguments.fleet_workers)
+    instances = fleet.plan_instances(instances_number=arguments.fleet,
+                                     manifest_instances=fleet_manifest_instances,
+                                     preferred_port=None if arguments.port == AUTO_PORT else arguments.port,
+                                     numa_node=arguments.numa_node, cpuset_cpus=arguments.cpuset_cpus)
+    try:
+        is_fleet_started = fleet.start(instances=instances, network_name=arguments.network_name)
+    except KeyboardInterrupt:
+        LOGGER.info('\nStopping the started instances...')
+        fleet.stop()
+        sys.exit(1)
+    sys.exit(0 if is_fleet_started else 1)
+
+
+def start_detached_replenisher(arguments: Namespace):
+    """
+    Fills the standby pool in a separate process that is not waited for. The process is started with the same
+    arguments in the pool maintenance mode without the pulling options, the imported image is passed by its reference.
+    """
+    replenisher_arguments = []
+    command_line_arguments = iter(sys.argv[1:])
+    for argument in command_line_arguments:
+        if argument in STANDBY_REPLENISHER_SKIPPED_OPTIONS:
+            # The value of the option is the next argument
+            next(command_line_arguments, None)
+        elif (argument not in STANDBY_REPLENISHER_SKIPPED_FLAGS
+              and argument.split('=', 1)[0] not in STANDBY_REPLENISHER_SKIPPED_OPTIONS):
+            replenisher_arguments.append(argument)
+    if arguments.import_bundle:
+        replenisher_arguments.extend(('--image', arguments.image))
+    LOGGER.debug(f'Starting the standby pool replenisher with the arguments: {replenisher_arguments}.')
+    command = [sys.executable, '-m', 'openvino_workbench.main', *replenisher_arguments]
+    # The process outlives the launch
+    subprocess.Popen(command,  # nosec # pylint: disable=consider-using-with
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+
+def refill_standby_pool(arguments: Namespace, standby_pool: StandbyPool):
+    """
+    Stops the replenisher of the interactive launch. The detached launch exits right after the container is
+    started, so the pool is refilled by a separate process instead of the launch waiting for a cold start.
+    """
+    if not arguments.pool_size:
+        return
+    if arguments.detached:
+        start_detached_replenisher(arguments)
+    else:
+        standby_pool.stop_replenisher()
+
+
+def start_from_standby_pool(arguments: Namespace, preflight_results: dict, config: dict) -> StandbyPool:
+    """
+    Fills the standby pool without "--claim", otherwise starts a pre-initialized container from the pool and exits.
+    Returns the pool if it is empty and a new container has to be started.
+    """
+    standby_pool = StandbyPool(docker_client=preflight_results['docker_client'], base_config=config,
+                               size=arguments.pool_size, port_allocator=preflight_results['port_allocator'],
+                               network_name=arguments.network_name,
+                               state_index=preflight_results['container_state'])
+
+    # Fill the pool of the pre-initialized containers, keep it filled until CMD/Ctrl+C in the interactive mode
+    if not arguments.claim:
+        LOGGER.info(f'Filling the standby pool up to {arguments.pool_size} containers...')
+        if arguments.detached:
+            created_standbys_number = standby_pool.replenish()
+            LOGGER.info(f'The standby pool is filled, {created_standbys_number} containers are added.')
+            sys.exit(0)
+        LOGGER.info('The pool is kept filled until CMD/Ctrl+C is pressed.')
+        try:
+            standby_pool.keep_replenished()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    # The interactive launch refills the pool in the background while it displays the container logs
+    claimed_port = standby_pool.claim(arguments.container_name)
+    if arguments.pool_size and not arguments.detached:
+        standby_pool.start_replenisher()
+    if not claimed_port:
+        LOGGER.info('There are no pre-initialized containers in the pool, starting a new one.')
+        return standby_pool
+
+    LOGGER.info(f'A pre-initialized container is claimed as "{arguments.container_name}", '
+                f'it uses the port {claimed_port}.')
+    claimed_container = DockerContainer(
+        docker_client=preflight_results['docker_client'], config={'name': arguments.container_name},
+        container_log_file=arguments.container_log_file,
+        container_log_file_max_size_mb=arguments.container_log_file_max_size)
+    try:
+        claimed_container.restart(arguments.detached)
+    except KeyboardInterrupt:
+        claimed_container.stop()
+    finally:
+        refill_standby_pool(arguments, standby_pool)
+    sys.exit(0)
 
 
 @save_logs_on_failure
@@ -32,11 +267,10 @@ def main():
     # Parse arguments
     arguments = StarterArgumentsParser().arguments
 
-    # Initialize Docker client
-    docker_client: DockerClient = initialize_docker_client()
-
     # Restart container if needed
     if arguments.restart:
+        # Initialize Docker client
+        docker_client: DockerClient = initialize_docker_client()
         container = DockerContainer(docker_client=docker_client, config={'name': arguments.restart})
         # Safe-restart a container, stop it on CMD/Ctrl+C as usual Docker container
         try:
@@ -46,9 +280,24 @@ def main():
             container.stop()
             sys.exit(0)
 
-    # Create config for Docker container
-    # config = create_config_for_container(arguments, LOGGER)
-    config = DockerConfigCreator(arguments=arguments).config
+    # Provide proxies for image pulling
+    proxies = get_proxies(arguments)
+    metadata_cache = RegistryMetadataCache(ttl=arguments.metadata_cache_ttl, refresh=arguments.refresh_metadata)
+
+    # Export the image to an offline bundle and exit
+    if arguments.export_bundle:
+        export_bundle(arguments, proxies, metadata_cache)
+
+    # Import the image from an offline bundle and start the DL Workbench with it
+    if arguments.import_bundle:
+        arguments.image = import_bundle(arguments)
+
+    # Several instances are started from the same config, each of them gets its own name and port
+    is_fleet = bool(arguments.fleet or arguments.fleet_manifest)
+    fleet_manifest_instances = read_fleet_manifest(arguments.fleet_manifest) if arguments.fleet_manifest else None
+
+    preflight_results = run_preflight(arguments, proxies, metadata_cache, is_fleet)
+    config = preflight_results['config']
 
     # Print starting message
     enabled_devices = {
@@ -58,33 +307,51 @@ def main():
     }
     print_starting_message(config=config, enabled_devices=enabled_devices, log_file=LOG_FILE)
 
-    # Provide proxies for image pulling
-    proxies = {}
-    if arguments.http_proxy:
-        proxies['http'] = arguments.http_proxy
-    if arguments.https_proxy:
-        proxies['https'] = arguments.https_proxy
-    if arguments.no_proxy:
-        proxies['no_proxy'] = arguments.no_proxy
-
     # Safe-pull an image, if interrupted stop pulling with understandable message
     try:
-        image = DockerImage(docker_client=docker_client, image_name=arguments.image, proxies=proxies)
-        image.pull(arguments.force_pull)
+        image: DockerImage = preflight_results['image']
+        image.pull(arguments.force_pull, show_layer_progress=arguments.show_layer_progress,
+                   pull_report_path=arguments.pull_report, stall_timeout=arguments.pull_stall_timeout)
     except KeyboardInterrupt:
         LOGGER.debug('Image pulling was interrupted.')
         LOGGER.info('Image pulling was interrupted. \n%s', ABORTING_EXIT_MESSAGE)
         sys.exit(1)
 
-    # Safe-start a container, stop it on CMD/Ctrl+C as usual Docker container
-    container = DockerContainer(docker_client=docker_client, config=config)
+    # Commit the initialized container to a derived image and exit
+    if arguments.bake:
+        bake_image(arguments, preflight_results, config)
+
+    # Start from the image with the initialized database if it is baked for the same image and arguments
+    if not arguments.no_baked_image:
+        use_baked_image(preflight_results, config)
+
+    # Create the volume for the DL Workbench data or reuse the existing one
+    if arguments.persistent_volume:
+        PersistentVolume(docker_client=preflight_results['docker_client'],
+                         name=arguments.persistent_volume).ensure(image_name=arguments.image)
+
+    # Start the instances of the fleet in the detached mode and exit
+    if is_fleet:
+        start_fleet(arguments, preflight_results, config, fleet_manifest_instances)
+
+    # Start a pre-initialized container from the pool or fill the pool in the pool maintenance mode
+    standby_pool = None
+    if arguments.pool_size or arguments.claim:
+        standby_pool = start_from_standby_pool(arguments, preflight_results, config)
+
     try:
-        container.start(detached=arguments.detached,
-                        network_name=arguments.network_name,
-                        network_alias=arguments.network_alias)
-    except KeyboardInterrupt:
-        container.stop()
-        sys.exit(0)
+        # Safe-start a container, stop it on CMD/Ctrl+C as usual Docker container
+        container: DockerContainer = preflight_results['container']
+        try:
+            container.start(detached=arguments.detached,
+                            network_name=arguments.network_name,
+                            network_alias=arguments.network_alias)
+        except KeyboardInterrupt:
+            container.stop()
+            sys.exit(0)
+    finally:
+        if standby_pool:
+            refill_standby_pool(arguments, standby_pool)
 
 
 if __name__ == '__main__':
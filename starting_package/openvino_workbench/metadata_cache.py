@@ -0,0 +1,107 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ On-disk cache of the image metadata requested from the registry
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+from typing import Optional
+
+from openvino_workbench.constants import (LOGGER_NAME, STARTER_CACHE_DIRECTORY_NAME, REGISTRY_METADATA_CACHE_FILE_NAME,
+                                          REGISTRY_METADATA_CACHE_TTL, REGISTRY_METADATA_CACHE_MAX_ENTRIES)
+
+
+def get_user_cache_directory() -> str:
+    user_os = platform.system()
+    if user_os == 'Windows':
+        cache_root = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    elif user_os == 'Darwin':
+        cache_root = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    else:
+        cache_root = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_root, STARTER_CACHE_DIRECTORY_NAME)
+
+
+class RegistryMetadataCache:
+    """
+    Keeps the metadata of the images (digest, sizes) keyed by `repository:tag` in a JSON file.
+    Entries older than the TTL are ignored, the oldest entries are evicted when the cache is full.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: int = REGISTRY_METADATA_CACHE_TTL,
+                 max_entries: int = REGISTRY_METADATA_CACHE_MAX_ENTRIES, refresh: bool = False):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.path = path or os.path.join(get_user_cache_directory(), REGISTRY_METADATA_CACHE_FILE_NAME)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Cached entries are not read, but are still updated with the fresh metadata
+        self.refresh = refresh
+
+    def get(self, key: str) -> Optional[dict]:
+        if self.refresh or self.ttl <= 0:
+            return None
+        entry = self._read_entries().get(key)
+        if not entry or time.time() - entry.get('timestamp', 0) > self.ttl:
+            return None
+        self._logger.debug(f'Using the cached registry metadata for the image {key}: {entry}.')
+        return entry
+
+    def put(self, key: str, **metadata):
+        if self.ttl <= 0:
+            return
+        entries = self._read_entries()
+        entry = entries.get(key, {})
+        # The fields added to the entry expire together with the fields cached first, so the timestamp is kept
+        # and a tag re-pushed to the registry is noticed within the TTL even if the entry is updated often
+        if time.time() - entry.get('timestamp', 0) > self.ttl:
+            entry = {'timestamp': time.time()}
+        entry.update(metadata)
+        entries[key] = entry
+
+        if len(entries) > self.max_entries:
+            oldest_keys = sorted(entries, key=lambda cached_key: entries[cached_key].get('timestamp', 0))
+            for oldest_key in oldest_keys[:len(entries) - self.max_entries]:
+                del entries[oldest_key]
+
+        self._write_entries(entries)
+
+    def _read_entries(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as cache_file:
+                entries = json.load(cache_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            self._logger.debug(f'Could not read the registry metadata cache: {self.path}.', exc_info=True)
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write_entries(self, entries: dict):
+        # Write to a temporary file first, so concurrent launches never read a partially written cache
+        try:
+            cache_directory = os.path.dirname(self.path)
+            os.makedirs(cache_directory, exist_ok=True)
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=cache_directory, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temporary_path, self.path)
+        except OSError:
+            self._logger.debug(f'Could not write the registry metadata cache: {self.path}.', exc_info=True)
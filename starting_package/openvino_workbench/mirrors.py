@@ -0,0 +1,88 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Selection of the registry mirrors to pull the image from
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from openvino_workbench.constants import LOGGER_NAME, REGISTRY_MIRROR_PROBE_TIMEOUT
+from openvino_workbench.registry import RegistryClient, split_registry_from_repository
+
+
+def parse_registry_mirror(mirror: str) -> Tuple[str, str, bool]:
+    """
+    Splits the mirror into the registry host, the path prefix in the registry and whether the mirror
+    is served over plain HTTP. Example: `http://cache.local:5000/dockerhub` -> ('cache.local:5000', 'dockerhub', True)
+    """
+    is_insecure = mirror.startswith('http://')
+    mirror = mirror.split('://', 1)[-1].strip('/')
+    registry, _, prefix = mirror.partition('/')
+    return registry, prefix, is_insecure
+
+
+class RegistryMirrorSelector:
+    """
+    Probes all the mirrors for the requested image in parallel and orders the ones that have it by the response time.
+    The mirror repository is the path of the image in its original registry under the mirror host and prefix,
+    e.g. `openvino/workbench` is looked up as `cache.local:5000/openvino/workbench`.
+    """
+
+    def __init__(self, mirrors: List[str], proxies: Optional[dict] = None,
+                 probe_timeout: float = REGISTRY_MIRROR_PROBE_TIMEOUT):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.mirrors = [parse_registry_mirror(mirror) for mirror in mirrors]
+        insecure_registries = [registry for registry, _, is_insecure in self.mirrors if is_insecure]
+        self.registry_client = RegistryClient(proxies=proxies, insecure_registries=insecure_registries,
+                                              timeout=probe_timeout)
+        # Response time in seconds of every probed mirror repository, None if it does not have the image
+        self.probe_results = {}
+
+    def get_mirror_repositories(self, repository: str) -> List[str]:
+        _, path = split_registry_from_repository(repository)
+        return [f'{registry}/{prefix}/{path}' if prefix else f'{registry}/{path}'
+                for registry, prefix, _ in self.mirrors]
+
+    def get_pull_sources(self, repository: str, reference: str) -> List[str]:
+        """Returns the mirror repositories that have the image from the fastest to the slowest"""
+        mirror_repositories = self.get_mirror_repositories(repository)
+        if not mirror_repositories:
+            return []
+
+        with ThreadPoolExecutor(max_workers=len(mirror_repositories)) as executor:
+            response_times = list(executor.map(lambda mirror_repository: self._probe(mirror_repository, reference),
+                                               mirror_repositories))
+        self.probe_results = dict(zip(mirror_repositories, response_times))
+        self._logger.debug(f'Registry mirrors probing results: {self.probe_results}')
+
+        available_mirrors = [(response_time, mirror_repository)
+                             for mirror_repository, response_time in self.probe_results.items()
+                             if response_time is not None]
+        return [mirror_repository for _, mirror_repository in sorted(available_mirrors)]
+
+    def _probe(self, mirror_repository: str, reference: str) -> Optional[float]:
+        registry, path = mirror_repository.split('/', 1)
+        started_at = time.monotonic()
+        try:
+            self.registry_client.get_manifest(registry, path, reference)
+        except Exception:
+            self._logger.debug(f'The mirror repository {mirror_repository} does not provide {reference}.',
+                               exc_info=True)
+            return None
+        return time.monotonic() - started_at
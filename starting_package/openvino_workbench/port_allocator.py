@@ -0,0 +1,114 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Allocation of the free host ports
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import platform
+import socket
+import threading
+from typing import Iterator, List, Optional, Set, Tuple
+
+from docker import DockerClient
+from openvino_workbench.constants import LOGGER_NAME, PORT_ALLOCATION_RANGE, STANDBY_PORT_LABEL
+
+
+class HostPortAllocator:
+    """
+    Takes one snapshot of the ports of the listening sockets on the host and of the ports published by
+    the running containers. The candidate ports are checked against the snapshot and then by binding to them,
+    the allocated ports are reserved, so the allocator never returns the same port twice,
+    even to the containers that are started concurrently.
+    """
+
+    def __init__(self, docker_client: DockerClient, ip_address: str = '0.0.0.0',  # nosec
+                 port_range: Tuple[int, int] = PORT_ALLOCATION_RANGE):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.ip_address = ip_address
+        self.port_range = port_range
+        self.taken_ports: Set[int] = set()
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        listening_ports = self._get_listening_ports()
+        published_ports = self._get_published_ports()
+        with self._lock:
+            self.taken_ports |= listening_ports | published_ports
+        self._logger.debug(f'Host ports snapshot: {len(listening_ports)} listening, '
+                           f'{len(published_ports)} published or reserved by the containers.')
+
+    def is_port_free(self, port: int) -> bool:
+        return port not in self.taken_ports and self._can_bind(port)
+
+    def allocate(self, preferred_port: Optional[int] = None) -> Optional[int]:
+        """Returns the preferred port if it is free or the first free port of the range, None if there is no one"""
+        with self._lock:
+            for port in self._get_candidate_ports(preferred_port):
+                if self.is_port_free(port):
+                    self.taken_ports.add(port)
+                    self._logger.debug(f'Allocated the host port: {port}.')
+                    return port
+                self.taken_ports.add(port)
+        return None
+
+    def allocate_many(self, ports_number: int, preferred_port: Optional[int] = None) -> List[int]:
+        ports = []
+        while len(ports) < ports_number:
+            port = self.allocate(preferred_port)
+            if port is None:
+                break
+            ports.append(port)
+        return ports
+
+    def _get_candidate_ports(self, preferred_port: Optional[int]) -> Iterator[int]:
+        if preferred_port:
+            yield preferred_port
+        range_start, range_end = self.port_range
+        yield from range(range_start, range_end + 1)
+
+    def _can_bind(self, port: int) -> bool:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe_socket:
+            # On Windows the option allows to bind to the port that is in use
+            if platform.system() != 'Windows':
+                probe_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                probe_socket.bind((self.ip_address, port))
+            except OSError:
+                return False
+        return True
+
+    def _get_listening_ports(self) -> Set[int]:
+        # The package is installed on Linux only and lists the sockets of other users only with enough permissions
+        try:
+            import psutil
+            return {connection.laddr.port for connection in psutil.net_connections(kind='inet')
+                    if connection.status == psutil.CONN_LISTEN}
+        except Exception:
+            self._logger.debug('Could not list the listening sockets, relying on the bind check.', exc_info=True)
+            return set()
+
+    def _get_published_ports(self) -> Set[int]:
+        published_ports = {port_binding['PublicPort']
+                           for container in self._client.api.containers()
+                           for port_binding in container.get('Ports') or []
+                           if port_binding.get('PublicPort')}
+        # Stopped standbys do not bind their ports but get them back when they are claimed
+        standbys = self._client.api.containers(all=True, filters={'label': STANDBY_PORT_LABEL})
+        reserved_ports = {int(container['Labels'][STANDBY_PORT_LABEL]) for container in standbys}
+        return published_ports | reserved_ports
@@ -0,0 +1,94 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Concurrent execution of the startup probes
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable
+
+from openvino_workbench.constants import LOGGER_NAME, PREFLIGHT_MAX_WORKERS
+
+
+class PreflightPipeline:
+    """
+    Runs the startup probes (Docker daemon, host and registry calls) on a thread pool.
+    A task starts as soon as all its dependencies are complete and receives their results
+    as keyword arguments, so the total time is bounded by the slowest chain of tasks.
+    """
+
+    def __init__(self, max_workers: int = PREFLIGHT_MAX_WORKERS):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self._max_workers = max_workers
+        self._tasks: Dict[str, Callable] = {}
+        self._dependencies: Dict[str, tuple] = {}
+        self.durations: Dict[str, float] = {}
+
+    def add_task(self, name: str, function: Callable, dependencies: Iterable[str] = ()):
+        unknown_dependencies = set(dependencies) - set(self._tasks)
+        if unknown_dependencies:
+            raise ValueError(f'Preflight task "{name}" depends on unknown tasks: {unknown_dependencies}')
+        self._tasks[name] = function
+        self._dependencies[name] = tuple(dependencies)
+
+    def run(self) -> Dict[str, Any]:
+        results = {}
+        started_at = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='preflight') as executor:
+            running = {}
+            pending = list(self._tasks)
+            while pending or running:
+                for name in [name for name in pending if all(dependency in results
+                                                             for dependency in self._dependencies[name])]:
+                    pending.remove(name)
+                    arguments = {dependency: results[dependency] for dependency in self._dependencies[name]}
+                    running[executor.submit(self._run_task, name, arguments)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException:
+                        for not_started in running:
+                            not_started.cancel()
+                        raise
+
+        wall_time = time.monotonic() - started_at
+        self._logger.debug(f'Preflight is complete in {wall_time:.2f} seconds, '
+                           f'critical path: {self.critical_path_duration:.2f} seconds, '
+                           f'sum of all tasks: {sum(self.durations.values()):.2f} seconds. '
+                           f'Tasks: {self.durations}.')
+        return results
+
+    @property
+    def critical_path_duration(self) -> float:
+        finish_times = {}
+        for name in self._tasks:
+            dependencies_finish = max((finish_times[dependency] for dependency in self._dependencies[name]),
+                                      default=0.)
+            finish_times[name] = dependencies_finish + self.durations.get(name, 0.)
+        return max(finish_times.values(), default=0.)
+
+    def _run_task(self, name: str, arguments: dict) -> Any:
+        started_at = time.monotonic()
+        try:
+            return self._tasks[name](**arguments)
+        finally:
+            self.durations[name] = time.monotonic() - started_at
+            self._logger.debug(f'Preflight task "{name}" took {self.durations[name]:.2f} seconds.')
@@ -0,0 +1,176 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Progress of the Docker image pulling
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import time
+from typing import Dict, Optional
+
+from openvino_workbench.constants import PULL_PROGRESS_REFRESH_INTERVAL, PULL_PROGRESS_EWMA_SMOOTHING
+from tqdm import tqdm
+
+
+class ThroughputEstimator:
+    """Smooths the throughput between the samples of the done work with an exponentially weighted moving average"""
+
+    def __init__(self, smoothing: float = PULL_PROGRESS_EWMA_SMOOTHING):
+        self.smoothing = smoothing
+        self.rate: Optional[float] = None
+        self.last_sample_time = 0.
+        self.last_sample_work = 0
+
+    def start(self):
+        self.last_sample_time = time.monotonic()
+
+    def exclude(self, work: int):
+        """Excludes the work that is done without transferring the data from the current sample"""
+        self.last_sample_work += work
+
+    def add_sample(self, done_work: int):
+        now = time.monotonic()
+        elapsed = now - self.last_sample_time
+        if elapsed > 0:
+            current_rate = (done_work - self.last_sample_work) / elapsed
+            if self.rate is None:
+                self.rate = current_rate
+            else:
+                self.rate = self.smoothing * current_rate + (1 - self.smoothing) * self.rate
+        self.last_sample_time = now
+        self.last_sample_work = done_work
+
+
+class PullProgressTracker:
+    """
+    Keeps running totals of downloaded and extracted bytes, so each progress event is processed in O(1).
+    The progress bar is redrawn at most once per refresh interval, the remaining time is estimated
+    from the exponentially weighted throughput.
+    """
+
+    # The remaining time is substituted by the tracker instead of the linear estimation of tqdm
+    BAR_FORMATTING = '{desc}: |{bar}|{percentage:3.0f}%. Elapsed Time: {elapsed}. Remaining (Estimated): {remaining}. '
+    LAYER_BAR_FORMATTING = '{desc}: |{bar}|{percentage:3.0f}%'
+
+    def __init__(self, layer_sizes: Dict[str, int], show_layers: bool = False,
+                 refresh_interval: float = PULL_PROGRESS_REFRESH_INTERVAL,
+                 smoothing: float = PULL_PROGRESS_EWMA_SMOOTHING):
+        self._layer_sizes = layer_sizes
+        # Both downloading and extraction of every layer are counted
+        self._total_work = 2 * sum(layer_sizes.values())
+        self._show_layers = show_layers
+        self._refresh_interval = refresh_interval
+        self._throughput = ThroughputEstimator(smoothing)
+
+        # Structure example:
+        # layers = {'id1': {'downloading': 1000, 'extracting': 2000},
+        #           'id2': {'downloading': 500000, 'extracting': 1000000}}
+        self._layers_info = {}
+        self._done_work = 0
+
+        self._progress_bar: Optional[tqdm] = None
+        self._layer_bars: Dict[str, tqdm] = {}
+        self._is_interrupted = False
+
+    def __enter__(self) -> 'PullProgressTracker':
+        self._progress_bar = tqdm(desc='Pulling Image', bar_format=self._get_bar_formatting('unknown'), total=100,
+                                  ncols=90, ascii=True)
+        self._throughput.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None and not self._is_interrupted:
+            self._render(progress=100)
+        for layer_bar in self._layer_bars.values():
+            layer_bar.close()
+        self._progress_bar.close()
+
+    @property
+    def progress(self) -> int:
+        if not self._total_work:
+            return 0
+        return min(int(self._done_work / self._total_work * 100), 100)
+
+    def interrupt(self):
+        """Keeps the actual progress on exit, e.g. the pull has stalled"""
+        self._is_interrupted = True
+
+    def update(self, progress_info: dict):
+        layer_id = progress_info['id']
+        status = progress_info['status']
+        if not layer_id:
+            return
+
+        if layer_id not in self._layers_info:
+            self._layers_info[layer_id] = {'downloading': 0, 'extracting': 0}
+        layer_size = self._layer_sizes.get(layer_id, 0)
+
+        # Get current progress of layer pulling
+        if status == 'Extracting':
+            self._set_layer_progress(layer_id, 'extracting', progress_info['current'])
+        elif status == 'Downloading':
+            self._set_layer_progress(layer_id, 'downloading', progress_info['current'])
+        elif status in ('Download complete', 'Verifying Checksum'):
+            self._set_layer_progress(layer_id, 'downloading', layer_size)
+        elif status == 'Already exists':
+            work_before = self._done_work
+            self._set_layer_progress(layer_id, 'downloading', layer_size)
+            self._set_layer_progress(layer_id, 'extracting', layer_size)
+            # Local layers are not transferred, so they should not increase the throughput
+            self._throughput.exclude(self._done_work - work_before)
+        elif status == 'Pull complete':
+            self._set_layer_progress(layer_id, 'downloading', layer_size)
+            self._set_layer_progress(layer_id, 'extracting', layer_size)
+        else:
+            return
+
+        if time.monotonic() - self._throughput.last_sample_time >= self._refresh_interval:
+            self._render(progress=self.progress)
+
+    def _set_layer_progress(self, layer_id: str, stage: str, current: int):
+        self._done_work += current - self._layers_info[layer_id][stage]
+        self._layers_info[layer_id][stage] = current
+
+    def _render(self, progress: int):
+        self._throughput.add_sample(self._done_work)
+
+        remaining = 'unknown'
+        if progress == 100:
+            remaining = tqdm.format_interval(0)
+        elif self._throughput.rate:
+            remaining = tqdm.format_interval(max(self._total_work - self._done_work, 0) / self._throughput.rate)
+        self._progress_bar.bar_format = self._get_bar_formatting(remaining)
+        self._progress_bar.n = progress
+        self._progress_bar.refresh()
+
+        if self._show_layers:
+            self._render_layers()
+
+    def _get_bar_formatting(self, remaining: str) -> str:
+        return self.BAR_FORMATTING.replace('{remaining}', remaining)
+
+    def _render_layers(self):
+        for layer_id, statuses in self._layers_info.items():
+            layer_size = self._layer_sizes.get(layer_id)
+            if not layer_size:
+                continue
+            if layer_id not in self._layer_bars:
+                self._layer_bars[layer_id] = tqdm(desc=f'  Layer {layer_id}', bar_format=self.LAYER_BAR_FORMATTING,
+                                                  total=100, ncols=90, ascii=True,
+                                                  position=len(self._layer_bars) + 1, leave=False)
+            layer_bar = self._layer_bars[layer_id]
+            layer_progress = int((statuses['downloading'] + statuses['extracting']) / (2 * layer_size) * 100)
+            layer_bar.n = min(layer_progress, 100)
+            layer_bar.refresh()
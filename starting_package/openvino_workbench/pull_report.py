@@ -0,0 +1,141 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Telemetry of the Docker image pulling
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import json
+import logging
+import platform
+import time
+from typing import Dict, List, Optional, Tuple
+
+from openvino_workbench.constants import LOGGER_NAME
+
+BYTES_IN_MEGABYTE = 1024 * 1024
+
+
+class PullTelemetryRecorder:
+    """
+    Records a timeline of every layer from the pull progress events: queued, download start and end,
+    extraction start and end, and saves it to a JSON report together with the aggregated statistics.
+    """
+
+    def __init__(self, image_name: str, layer_sizes: Optional[Dict[str, int]] = None):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.image_name = image_name
+        self._layer_sizes = layer_sizes or {}
+        self.layers: Dict[str, dict] = {}
+        self.source: Optional[str] = None
+        self._started_at = time.time()
+        self._finished_at: Optional[float] = None
+        # Downloaded bytes per second since the start of pulling
+        self._downloaded_per_second: Dict[int, int] = {}
+
+    def record(self, progress_info: dict, timestamp: Optional[float] = None):
+        timestamp = timestamp or time.time()
+        self._finished_at = timestamp
+        layer_id = progress_info['id']
+        status = progress_info['status']
+        if not layer_id or status.startswith('Pulling from'):
+            return
+
+        layer = self.layers.setdefault(layer_id, {'id': layer_id, 'bytes': self._layer_sizes.get(layer_id, 0),
+                                                  'queued': timestamp, 'already_exists': False,
+                                                  'download_start': None, 'download_end': None,
+                                                  'extract_start': None, 'extract_end': None,
+                                                  '_downloaded': 0})
+        if progress_info['total_layer_weight'] and status == 'Downloading':
+            layer['bytes'] = progress_info['total_layer_weight']
+
+        if status == 'Already exists':
+            layer['already_exists'] = True
+        elif status == 'Downloading':
+            layer['download_start'] = layer['download_start'] or timestamp
+            second = int(timestamp - self._started_at)
+            self._downloaded_per_second[second] = (self._downloaded_per_second.get(second, 0) +
+                                                   progress_info['current'] - layer['_downloaded'])
+            layer['_downloaded'] = progress_info['current']
+        elif status in ('Verifying Checksum', 'Download complete'):
+            layer['download_end'] = layer['download_end'] or timestamp
+        elif status == 'Extracting':
+            layer['extract_start'] = layer['extract_start'] or timestamp
+        elif status == 'Pull complete':
+            layer['extract_end'] = timestamp
+
+    def build_report(self) -> dict:
+        finished_at = self._finished_at or time.time()
+        layers = []
+        download_intervals = []
+        extract_intervals = []
+        for layer in self.layers.values():
+            report_layer = {key: value for key, value in layer.items() if not key.startswith('_')}
+            for key in ('queued', 'download_start', 'download_end', 'extract_start', 'extract_end'):
+                if report_layer[key] is not None:
+                    report_layer[key] = round(report_layer[key] - self._started_at, 3)
+
+            report_layer['download_mb_per_second'] = None
+            if layer['download_start'] and layer['download_end']:
+                download_intervals.append((layer['download_start'], layer['download_end']))
+                download_time = layer['download_end'] - layer['download_start']
+                if download_time > 0:
+                    report_layer['download_mb_per_second'] = round(layer['bytes'] / BYTES_IN_MEGABYTE
+                                                                   / download_time, 3)
+            if layer['extract_start'] and layer['extract_end']:
+                extract_intervals.append((layer['extract_start'], layer['extract_end']))
+            layers.append(report_layer)
+
+        downloaded_bytes = sum(layer['bytes'] for layer in self.layers.values()
+                               if not layer['already_exists'] and layer['download_start'])
+        download_time = self._get_intervals_union_duration(download_intervals)
+        return {
+            'image': self.image_name,
+            'source': self.source,
+            'host': platform.node(),
+            'started_at': self._started_at,
+            'wall_time_seconds': round(finished_at - self._started_at, 3),
+            'download_time_seconds': round(download_time, 3),
+            'extract_time_seconds': round(self._get_intervals_union_duration(extract_intervals), 3),
+            'downloaded_bytes': downloaded_bytes,
+            'layers_already_present': sum(layer['already_exists'] for layer in self.layers.values()),
+            'average_download_mb_per_second': (round(downloaded_bytes / BYTES_IN_MEGABYTE / download_time, 3)
+                                               if download_time else None),
+            'peak_download_mb_per_second': round(max(self._downloaded_per_second.values(), default=0)
+                                                 / BYTES_IN_MEGABYTE, 3),
+            'layers': layers,
+        }
+
+    def save(self, path: str):
+        report = self.build_report()
+        with open(path, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+        self._logger.debug(f'Pull report is saved to: {path}.')
+        self._logger.info(f'Pull report is saved to: {path}')
+
+    @staticmethod
+    def _get_intervals_union_duration(intervals: List[Tuple[float, float]]) -> float:
+        duration = 0.
+        current_start, current_end = None, None
+        for start, end in sorted(intervals):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    duration += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            duration += current_end - current_start
+        return duration
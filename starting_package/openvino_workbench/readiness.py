@@ -0,0 +1,191 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Event-driven detection of the DL Workbench container readiness
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import calendar
+import logging
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from docker import DockerClient
+from openvino_workbench.constants import STAGE_COMPLETE_MESSAGES, CONTAINER_START_TIMEOUT, LOGGER_NAME
+
+
+def docker_timestamp_to_nanoseconds(timestamp: str) -> int:
+    """
+    Converts an RFC 3339 timestamp reported by Docker (logs, inspect) to nanoseconds since the epoch.
+    Docker trims trailing zeros in the fractional part, so the strings cannot be compared directly.
+    The fractional part and the UTC offset are optional, e.g. 2024-01-01T00:00:08+02:00.
+    """
+    match = re.fullmatch(r'(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)?', timestamp)
+    if not match:
+        raise ValueError(f'Unexpected Docker timestamp: {timestamp}')
+    date_time, fraction, utc_offset = match.groups()
+    utc_offset_seconds = 0
+    if utc_offset and utc_offset != 'Z':
+        hours, minutes = utc_offset[1:].split(':')
+        utc_offset_seconds = (1 if utc_offset[0] == '+' else -1) * (int(hours) * 3600 + int(minutes) * 60)
+    seconds = calendar.timegm(datetime.strptime(date_time, '%Y-%m-%dT%H:%M:%S').timetuple()) - utc_offset_seconds
+    return seconds * 10 ** 9 + int((fraction or '').ljust(9, '0')[:9])
+
+
+class StageLogMatcher:
+    """
+    Consumes the container log byte stream once and tracks all the starting stages with a single pattern.
+    The log stream is expected to be requested with timestamps, lines that are not newer than the cursor
+    (nanoseconds since the epoch) are skipped.
+    """
+
+    def __init__(self, stage_messages: tuple = STAGE_COMPLETE_MESSAGES, cursor: Optional[int] = None):
+        self._stage_messages = stage_messages
+        self._pattern = re.compile('|'.join(f'(?P<stage_{index}>{message})'
+                                            for index, message in enumerate(stage_messages)).encode())
+        self.completed_stages = set()
+        self._initial_cursor = cursor
+        self._is_past_initial_cursor = cursor is None
+        self._unfinished_line = b''
+
+    @property
+    def stages_number(self) -> int:
+        return len(self._stage_messages)
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.completed_stages) == self.stages_number
+
+    def feed(self, chunk: bytes) -> List[int]:
+        if b'\n' not in chunk:
+            self._unfinished_line += chunk
+            return []
+
+        complete_lines, _, self._unfinished_line = (self._unfinished_line + chunk).rpartition(b'\n')
+        if not self._is_past_initial_cursor:
+            complete_lines = self._skip_lines_before_cursor(complete_lines)
+
+        newly_completed_stages = []
+        for match in self._pattern.finditer(complete_lines):
+            stage_index = int(match.lastgroup.rsplit('_', 1)[1])
+            if stage_index not in self.completed_stages:
+                self.completed_stages.add(stage_index)
+                newly_completed_stages.append(stage_index)
+        return newly_completed_stages
+
+    def _skip_lines_before_cursor(self, complete_lines: bytes) -> bytes:
+        line_start = 0
+        while line_start < len(complete_lines):
+            timestamp = complete_lines[line_start:].split(b' ', 1)[0]
+            if docker_timestamp_to_nanoseconds(timestamp.decode()) > self._initial_cursor:
+                self._is_past_initial_cursor = True
+                return complete_lines[line_start:]
+            line_end = complete_lines.find(b'\n', line_start)
+            if line_end == -1:
+                break
+            line_start = line_end + 1
+        return b''
+
+
+class ContainerReadinessWatcher:
+    """
+    Follows a single log stream of the container and reports every starting stage
+    from the STAGE_COMPLETE_MESSAGES as soon as its line appears in the logs.
+    """
+
+    # Marks the end of the log stream, i.e. the container has exited
+    _STREAM_END = None
+
+    def __init__(self, docker_client: DockerClient, container_name: str, timeout: int = CONTAINER_START_TIMEOUT):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.container_name = container_name
+        self.timeout = timeout
+        self.matcher = None
+        self._events = queue.Queue()
+        self._log_stream = None
+        # Seconds passed from the start of waiting to the completion of each stage
+        self.stage_durations = []
+
+    @property
+    def ready_duration(self) -> Optional[float]:
+        """Seconds from the start of waiting until all the starting stages completed"""
+        if self.matcher is None or len(self.stage_durations) < self.matcher.stages_number:
+            return None
+        return self.stage_durations[-1]
+
+    def wait_until_ready(self, log_cursor: Optional[int] = None,
+                         on_stage_complete: Optional[Callable[[int], None]] = None) -> bool:
+        """
+        Waits for all the starting stages to complete. Log lines that are not newer than the `log_cursor`
+        (nanoseconds since the epoch) are not taken into account, so the output of the previous runs of
+        a restarted container does not complete the stages.
+        """
+        self._logger.debug(f'Following logs of the container "{self.container_name}" after {log_cursor}.')
+        started_at = time.monotonic()
+        deadline = started_at + self.timeout
+
+        self.matcher = StageLogMatcher(cursor=log_cursor)
+        logs_parameters = {'since': log_cursor // 10 ** 9} if log_cursor else {}
+        self._log_stream = self._client.api.logs(container=self.container_name, stream=True, follow=True,
+                                                 timestamps=True, **logs_parameters)
+        reader = threading.Thread(target=self._read_log_stream, daemon=True)
+        reader.start()
+
+        completed_stages = set()
+        reported_stages_number = 0
+        try:
+            while reported_stages_number < self.matcher.stages_number:
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0:
+                    raise queue.Empty
+                completed_stage_index = self._events.get(timeout=remaining_time)
+                if completed_stage_index is self._STREAM_END:
+                    self._logger.debug('The log stream was closed before the container became ready.')
+                    return False
+
+                completed_stages.add(completed_stage_index)
+                self._logger.debug(f'Container starting stage {completed_stage_index} is complete '
+                                   f'in {time.monotonic() - started_at:.1f} seconds.')
+                # Stages might complete out of order, report them in order
+                while reported_stages_number in completed_stages:
+                    self.stage_durations.append(time.monotonic() - started_at)
+                    if on_stage_complete:
+                        on_stage_complete(reported_stages_number)
+                    reported_stages_number += 1
+        except queue.Empty:
+            self._logger.debug(f'The container did not become ready in {self.timeout} seconds. '
+                               f'Completed stages: {sorted(completed_stages)}.')
+            return False
+        finally:
+            self._log_stream.close()
+
+        return True
+
+    def _read_log_stream(self):
+        try:
+            for chunk in self._log_stream:
+                for stage_index in self.matcher.feed(chunk):
+                    self._events.put(stage_index)
+                if self.matcher.is_complete:
+                    return
+        except Exception:
+            # The stream is closed from the waiting thread on timeout
+            self._logger.debug('Stopped reading the container log stream.', exc_info=True)
+        self._events.put(self._STREAM_END)
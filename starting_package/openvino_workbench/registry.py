@@ -0,0 +1,111 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Requests to the Docker Registry HTTP API
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import platform
+import re
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from openvino_workbench.constants import LOGGER_NAME, DOCKER_HUB_REGISTRY, DOCKER_HUB_REGISTRY_API_HOST
+from openvino_workbench.http_session import get_http_session
+
+MANIFEST_LIST_MEDIA_TYPES = ('application/vnd.docker.distribution.manifest.list.v2+json',
+                             'application/vnd.oci.image.index.v1+json')
+MANIFEST_MEDIA_TYPES = ('application/vnd.docker.distribution.manifest.v2+json',
+                        'application/vnd.oci.image.manifest.v1+json')
+
+# Names of the architectures in the image manifests
+ARCHITECTURES = {'x86_64': 'amd64', 'amd64': 'amd64', 'aarch64': 'arm64', 'arm64': 'arm64'}
+
+
+def split_registry_from_repository(repository: str) -> Tuple[str, str]:
+    """
+    Splits the repository name into the registry host and the path in the registry in the same way
+    as Docker does: the first component is a registry if it has a dot, a port or is `localhost`.
+    """
+    first_component, _, rest = repository.partition('/')
+    if rest and ('.' in first_component or ':' in first_component or first_component == 'localhost'):
+        registry, path = first_component, rest
+    else:
+        registry, path = DOCKER_HUB_REGISTRY, repository
+    if registry == DOCKER_HUB_REGISTRY and '/' not in path:
+        path = f'library/{path}'
+    return registry, path
+
+
+class RegistryClient:
+    def __init__(self, proxies: Optional[dict] = None, insecure_registries: Iterable[str] = (),
+                 timeout: Optional[Union[float, Tuple[float, float]]] = None):
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.proxies = proxies or {}
+        self._session = get_http_session(self.proxies)
+        # Registries that are served over plain HTTP, e.g. local pull-through caches
+        self.insecure_registries = set(insecure_registries)
+        # The session adapter applies the default timeout if it is not provided
+        self.timeout = timeout
+        # Anonymous pull tokens keyed by the registry and the repository path
+        self._tokens = {}
+
+    def get_layer_sizes(self, repository: str, reference: str) -> Dict[str, int]:
+        """
+        Returns compressed sizes of the image layers keyed by the layer digest.
+        The reference is a tag or a digest, for multi-platform images the manifest of the host platform is used.
+        """
+        registry, path = split_registry_from_repository(repository)
+        manifest = self.get_manifest(registry, path, reference)
+
+        if manifest.get('mediaType') in MANIFEST_LIST_MEDIA_TYPES or 'manifests' in manifest:
+            platform_digest = self._select_platform_manifest(manifest['manifests'])
+            manifest = self.get_manifest(registry, path, platform_digest)
+
+        return {layer['digest']: layer['size'] for layer in manifest['layers']}
+
+    def get_manifest(self, registry: str, path: str, reference: str) -> dict:
+        api_host = DOCKER_HUB_REGISTRY_API_HOST if registry == DOCKER_HUB_REGISTRY else registry
+        scheme = 'http' if registry in self.insecure_registries else 'https'
+        url = f'{scheme}://{api_host}/v2/{path}/manifests/{reference}'
+        headers = {'Accept': ', '.join(MANIFEST_LIST_MEDIA_TYPES + MANIFEST_MEDIA_TYPES)}
+        if (registry, path) in self._tokens:
+            headers['Authorization'] = f'Bearer {self._tokens[(registry, path)]}'
+
+        response = self._session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 401 and 'WWW-Authenticate' in response.headers:
+            self._tokens[(registry, path)] = self._get_anonymous_token(response.headers['WWW-Authenticate'])
+            headers['Authorization'] = f'Bearer {self._tokens[(registry, path)]}'
+            response = self._session.get(url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _get_anonymous_token(self, authenticate_header: str) -> str:
+        # Example: Bearer realm="https://auth.docker.io/token",service="registry.docker.io",scope="repository:..."
+        challenge = dict(re.findall(r'(\w+)="([^"]*)"', authenticate_header))
+        realm = challenge.pop('realm')
+        response = self._session.get(realm, params=challenge, timeout=self.timeout)
+        response.raise_for_status()
+        token_info = response.json()
+        return token_info.get('token') or token_info['access_token']
+
+    def _select_platform_manifest(self, manifests: list) -> str:
+        architecture = ARCHITECTURES.get(platform.machine().lower(), 'amd64')
+        for manifest in manifests:
+            manifest_platform = manifest.get('platform', {})
+            if manifest_platform.get('os') == 'linux' and manifest_platform.get('architecture') == architecture:
+                return manifest['digest']
+        self._logger.debug(f'There is no manifest for the "{architecture}" architecture, using the first one.')
+        return manifests[0]['digest']
@@ -0,0 +1,159 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Pool of the pre-initialized DL Workbench containers
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import copy
+import logging
+import threading
+from typing import List, Optional
+
+from docker import DockerClient
+from docker.errors import APIError
+from openvino_workbench.constants import (LOGGER_NAME, INTERNAL_PORT, STANDBY_POOL_LABEL, STANDBY_PORT_LABEL,
+                                          STANDBY_POOL_REPLENISH_INTERVAL, STANDBY_CONTAINER_NAME_PREFIX)
+from openvino_workbench.container import DockerContainer
+from openvino_workbench.container_state import ContainerStateIndex
+from openvino_workbench.docker_config_creator import get_config_hash
+from openvino_workbench.port_allocator import HostPortAllocator
+
+
+class StandbyPool:
+    """
+    Keeps the target number of stopped containers that went through the first start, i.e. the database
+    is initialized. A claimed standby is renamed to the requested name and restarted, which takes seconds.
+    Standbys are created from the config of a usual launch and match it by the config hash label.
+    Docker cannot change the port binding of a container, so every standby reserves its own host port
+    with a label that the port allocator takes into account.
+    """
+
+    def __init__(self, docker_client: DockerClient, base_config: dict, size: int, port_allocator: HostPortAllocator,
+                 network_name: str, state_index: Optional[ContainerStateIndex] = None):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.base_config = base_config
+        self.size = size
+        self.config_hash = get_config_hash(base_config)
+        self.network_name = network_name
+        self._port_allocator = port_allocator
+        self._state_index = state_index or ContainerStateIndex(docker_client)
+        self._stop_replenishing = threading.Event()
+        self._replenisher: Optional[threading.Thread] = None
+
+    def list_standbys(self, status: Optional[str] = None) -> List[dict]:
+        filters = {'label': f'{STANDBY_POOL_LABEL}={self.config_hash}',
+                   'name': f'^/{STANDBY_CONTAINER_NAME_PREFIX}'}
+        if status:
+            filters['status'] = status
+        return self._client.api.containers(all=True, filters=filters)
+
+    def claim(self, container_name: str) -> Optional[int]:
+        """Renames a ready standby to the container name, returns its public port or None if the pool is empty"""
+        for standby in self.list_standbys(status='exited'):
+            standby_name = standby['Names'][0].lstrip('/')
+            try:
+                self._client.api.rename(standby['Id'], container_name)
+            except APIError:
+                # The standby is claimed by another starter
+                self._logger.debug(f'Could not claim the standby "{standby_name}".', exc_info=True)
+                continue
+            self._logger.debug(f'The standby "{standby_name}" is claimed as "{container_name}".')
+            return int(standby['Labels'][STANDBY_PORT_LABEL])
+        self._logger.debug('There are no standbys in the pool.')
+        return None
+
+    def replenish(self) -> int:
+        """Creates standbys until the pool has the target size, returns the number of created standbys"""
+        standbys = self.list_standbys()
+        for standby in standbys:
+            # The standby was interrupted before it became ready, its database might be incomplete
+            if standby['State'] in ('created', 'dead'):
+                self._logger.debug(f'Removing the broken standby: {standby["Names"][0]}.')
+                self._client.api.remove_container(standby['Id'], force=True)
+        missing_standbys_number = self.size - sum(standby['State'] not in ('created', 'dead') for standby in standbys)
+
+        created_standbys_number = 0
+        for _ in range(missing_standbys_number):
+            if self._stop_replenishing.is_set():
+                break
+            if self._create_standby():
+                created_standbys_number += 1
+        return created_standbys_number
+
+    def keep_replenished(self, interval: float = STANDBY_POOL_REPLENISH_INTERVAL):
+        """
+        Checks the pool size until the replenishing is stopped. The pool is listed again only after a container
+        event, e.g. a claim or a removal of a standby, or periodically if the events are not available.
+        """
+        self._state_index.watch()
+        try:
+            is_changed = True
+            while not self._stop_replenishing.is_set():
+                if is_changed or not self._state_index.is_watching:
+                    try:
+                        created_standbys_number = self.replenish()
+                        if created_standbys_number:
+                            self._logger.debug(f'{created_standbys_number} standbys are added to the pool.')
+                    except Exception:
+                        self._logger.debug('Could not replenish the standby pool.', exc_info=True)
+                is_changed = self._state_index.wait_for_change(interval)
+        finally:
+            self._state_index.stop_watching()
+
+    def start_replenisher(self, interval: float = STANDBY_POOL_REPLENISH_INTERVAL):
+        self._stop_replenishing.clear()
+        self._replenisher = threading.Thread(target=self.keep_replenished, args=(interval,), daemon=True)
+        self._replenisher.start()
+
+    def stop_replenisher(self):
+        """Waits for the standby that is being created to become ready and stops replenishing"""
+        self._stop_replenishing.set()
+        self._state_index.wake_waiters()
+        if self._replenisher is not None and self._replenisher.is_alive():
+            self._logger.info('Waiting for the standby container that is being prepared...')
+            self._replenisher.join()
+
+    def _create_standby(self) -> bool:
+        port = self._port_allocator.allocate()
+        if port is None:
+            self._logger.debug('There are no free ports for the standby.')
+            return False
+        standby_name = self._get_free_standby_name()
+        config = copy.deepcopy(self.base_config)
+        ip_address, _ = config['ports'][INTERNAL_PORT]
+        config['name'] = standby_name
+        config['ports'][INTERNAL_PORT] = (ip_address, port)
+        config['environment']['PUBLIC_PORT'] = port
+        config['labels'] = {STANDBY_POOL_LABEL: self.config_hash, STANDBY_PORT_LABEL: str(port)}
+
+        self._logger.debug(f'Creating the standby "{standby_name}" on the port {port}.')
+        standby = DockerContainer(docker_client=self._client, config=config, state_index=self._state_index)
+        is_ready = standby.start_in_background(network_name=self.network_name,
+                                               network_alias=config['environment']['NETWORK_ALIAS'])
+        if not is_ready:
+            self._logger.debug(f'The standby "{standby_name}" did not become ready, removing it.')
+            self._client.api.remove_container(standby_name, force=True)
+            return False
+        self._client.api.stop(standby_name)
+        return True
+
+    def _get_free_standby_name(self) -> str:
+        taken_names = self._state_index.get_names_with_prefix(STANDBY_CONTAINER_NAME_PREFIX)
+        index = 0
+        while f'{STANDBY_CONTAINER_NAME_PREFIX}{index}' in taken_names:
+            index += 1
+        return f'{STANDBY_CONTAINER_NAME_PREFIX}{index}'
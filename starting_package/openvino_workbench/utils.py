@@ -24,11 +24,12 @@ from typing import Optional, Callable
 
 import docker
 from openvino_workbench.constants import INTERNAL_PORT, LOGGER, ABORTING_EXIT_MESSAGE, \
-    DOCKER_ERROR_PATTERNS
+    DOCKER_ERROR_PATTERNS, HOST_NETWORK_MODE
 
 
 def print_starting_message(config: dict, enabled_devices: dict, log_file: str):
-    bound_ip, port = config['ports'][INTERNAL_PORT]
+    # The ports are not published in the host network mode
+    bound_ip, port = config.get('ports', {}).get(INTERNAL_PORT, (f'{HOST_NETWORK_MODE} network', INTERNAL_PORT))
     docker_environment = config.get('environment', {})
     authentication_enabled = docker_environment.get('ENABLE_AUTH') == 1
     disable_token_saving = docker_environment.get('SAVE_TOKEN_TO_FILE') == 0
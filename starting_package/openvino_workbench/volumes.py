@@ -0,0 +1,67 @@
+"""
+ OpenVINO DL Workbench Python Starter
+ Named Docker volumes for the DL Workbench data
+
+ Copyright (c) 2021 Intel Corporation
+
+ Licensed under the Apache License, Version 2.0 (the "License");
+ you may not use this file except in compliance with the License.
+ You may obtain a copy of the License at
+
+      http://www.apache.org/licenses/LICENSE-2.0
+
+ Unless required by applicable law or agreed to in writing, software
+ distributed under the License is distributed on an "AS IS" BASIS,
+ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ See the License for the specific language governing permissions and
+ limitations under the License.
+"""
+
+import logging
+import sys
+
+from docker import DockerClient
+from docker.errors import APIError, NotFound
+from openvino_workbench.constants import (LOGGER_NAME, ABORTING_EXIT_MESSAGE, PERSISTENT_VOLUME_LABEL,
+                                          PERSISTENT_VOLUME_IMAGE_LABEL)
+
+
+class PersistentVolume:
+    """
+    Keeps the database, the models and the configuration of the DL Workbench in a named volume,
+    so a re-created container finds them initialized. Docker copies the content and the owner of the mounted
+    directory of the image to an empty volume, so the volume does not need the permission setup of a local directory.
+    """
+
+    def __init__(self, docker_client: DockerClient, name: str):
+        self._client = docker_client
+        self._logger = logging.getLogger(LOGGER_NAME)
+        self.name = name
+
+    def ensure(self, image_name: str) -> bool:
+        """Creates the volume labeled with the image if it does not exist, returns whether it is created"""
+        try:
+            volume = self._client.api.inspect_volume(self.name)
+        except NotFound:
+            self._logger.debug(f'Creating the volume "{self.name}" for the image {image_name}.')
+            try:
+                self._client.api.create_volume(name=self.name, labels={PERSISTENT_VOLUME_LABEL: 'true',
+                                                                       PERSISTENT_VOLUME_IMAGE_LABEL: image_name})
+            except APIError:
+                self._logger.debug(f'Could not create the volume "{self.name}".', exc_info=True)
+                self._logger.info(f'ERROR: Could not create the volume "{self.name}".{ABORTING_EXIT_MESSAGE}')
+                sys.exit(1)
+            self._logger.info(f'The DL Workbench data is stored in the new volume "{self.name}".')
+            return True
+
+        labels = volume.get('Labels') or {}
+        if PERSISTENT_VOLUME_LABEL not in labels:
+            self._logger.info(f'WARNING: The volume "{self.name}" is not created by the DL Workbench starter, '
+                              'its content might be incompatible with DL Workbench.')
+        elif labels.get(PERSISTENT_VOLUME_IMAGE_LABEL) != image_name:
+            # Labels of a volume cannot be changed, so the label keeps the image that initialized the data
+            self._logger.info(f'WARNING: The data in the volume "{self.name}" is initialized by the image '
+                              f'{labels.get(PERSISTENT_VOLUME_IMAGE_LABEL)}. DL Workbench migrates the data to '
+                              'a newer version, the older versions might not start with it.')
+        self._logger.info(f'Reusing the DL Workbench data from the volume "{self.name}".')
+        return False